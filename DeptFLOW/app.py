@@ -1,20 +1,36 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-from habit_manager import HabitManager
+from habit_manager import HabitManager, create_maintenance_scheduler
 from visualizations import (
     create_completion_heatmap,
     create_completion_rate_chart,
     create_habit_summary,
-    create_weekly_pattern
+    create_weekly_pattern,
+    compute_overview_summary,
+    compute_habit_correlation,
+    create_overview_rate_chart,
+    create_correlation_heatmap
 )
 
-# Initialize session state
-if 'habit_manager' not in st.session_state:
-    st.session_state.habit_manager = HabitManager()
+@st.cache_resource
+def start_maintenance():
+    # One background maintenance thread per Streamlit server process
+    scheduler = create_maintenance_scheduler()
+    scheduler.start()
+    return scheduler
+
+def init_habit_manager():
+    # Each user gets their own partition of the shared habit database
+    username = st.sidebar.text_input("User", value='default', key='username').strip() or 'default'
+    manager = st.session_state.get('habit_manager')
+    if manager is None or manager.owner != username:
+        st.session_state.habit_manager = HabitManager(username)
 
 def main():
     st.title("Habit Tracker")
+    start_maintenance()
+    init_habit_manager()
     
     # Sidebar navigation
     page = st.sidebar.radio("Navigation", ["Daily Check-in", "Manage Habits", "Analytics", "Export Data"])
@@ -86,21 +102,27 @@ def show_analytics():
         st.warning("No habits to analyze yet.")
         return
     
-    # Habit selection for detailed analysis
-    selected_habit = st.selectbox(
-        "Select Habit for Detailed Analysis",
-        habits['name']
-    )
-    selected_habit_id = habits[habits['name'] == selected_habit]['id'].iloc[0]
+    view = st.radio("View", ["Single Habit", "All Habits Overview"], horizontal=True)
     
     # Time range selection
     time_range = st.slider(
         "Select Time Range (days)",
         min_value=7,
-        max_value=90,
+        max_value=1825,
         value=30
     )
     
+    if view == "All Habits Overview":
+        show_overview(time_range)
+        return
+    
+    # Habit selection for detailed analysis
+    selected_habit = st.selectbox(
+        "Select Habit for Detailed Analysis",
+        habits['name']
+    )
+    selected_habit_id = int(habits[habits['name'] == selected_habit]['id'].iloc[0])
+    
     # Get habit data
     habit_data = st.session_state.habit_manager.get_habit_data(
         selected_habit_id,
@@ -109,11 +131,14 @@ def show_analytics():
     
     # Display streak information
     current_streak, max_streak = st.session_state.habit_manager.get_streaks(selected_habit_id)
-    col1, col2 = st.columns(2)
+    completion_rate = st.session_state.habit_manager.get_completion_rate(selected_habit_id, time_range)
+    col1, col2, col3 = st.columns(3)
     with col1:
         st.metric("Current Streak", current_streak)
     with col2:
         st.metric("Longest Streak", max_streak)
+    with col3:
+        st.metric("Completion Rate", f"{completion_rate:.0%}")
     
     # Display visualizations
     st.subheader("Completion Heatmap")
@@ -137,6 +162,32 @@ def show_analytics():
     if not summary.empty:
         st.dataframe(summary)
 
+def show_overview(time_range):
+    # One query for every habit, then all metrics straight off the habits x days matrix
+    habits, _, completed, logged = st.session_state.habit_manager.get_overview_data(time_range)
+    summary = compute_overview_summary(habits, completed, logged)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Habits", len(habits))
+    with col2:
+        total_logged = summary['Days Logged'].sum()
+        overall_rate = summary['Days Completed'].sum() / total_logged if total_logged else 0.0
+        st.metric("Overall Completion Rate", f"{overall_rate:.0%}")
+    
+    st.subheader("Completion Rate by Habit")
+    rate_chart = create_overview_rate_chart(summary)
+    if rate_chart:
+        st.plotly_chart(rate_chart)
+    
+    st.subheader("Habit Correlation")
+    correlation_chart = create_correlation_heatmap(compute_habit_correlation(habits, completed, logged))
+    if correlation_chart:
+        st.plotly_chart(correlation_chart)
+    
+    st.subheader("Summary Statistics")
+    st.dataframe(summary)
+
 def show_export():
     st.header("Export Data")
     
@@ -3,13 +3,18 @@ import discord
 from discord.ext import commands
 from discord import Webhook, app_commands
 from discord.app_commands import checks
-import aiohttp
 import asyncio
+import re
+import time
 from database import WebhookDatabase
 from database import BotConfigDatabase
+from database import ActionHistoryDatabase
+from roblox_client import RobloxClient, RobloxAPIError, CircuitOpenError
+from rate_limit import RateLimiter, RateLimitExceeded
+from maintenance import MaintenanceScheduler
 from dotenv import load_dotenv
-from typing import Optional
-from datetime import datetime
+from typing import Dict, Optional
+from datetime import datetime, timedelta, timezone
 
 # Load environment variables
 load_dotenv()
@@ -25,6 +30,12 @@ class CustomBot(commands.Bot):
     def __init__(self):
         super().__init__(command_prefix='!', intents=intents)
         self.tree.error(self.on_app_command_error)
+        # time.monotonic() of the last interaction, so maintenance can wait for quiet periods
+        self.last_activity = time.monotonic()
+        self.maintenance = MaintenanceScheduler(
+            ['webhooks.db', 'bot_config.db', 'action_history.db'],
+            lambda: self.last_activity
+        )
 
     async def setup_hook(self):
         print("Setting up command tree...")
@@ -37,6 +48,15 @@ class CustomBot(commands.Bot):
         except Exception as e:
             print(f"Failed to sync commands: {e}")
         print("Command tree synced!")
+        self.maintenance.start()
+
+    async def close(self):
+        self.maintenance.stop()
+        await roblox_client.close()
+        await super().close()
+
+    async def on_interaction(self, interaction: discord.Interaction):
+        self.last_activity = time.monotonic()
 
     async def on_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
         if isinstance(error, app_commands.CommandOnCooldown):
@@ -49,9 +69,12 @@ class CustomBot(commands.Bot):
         print(f'{self.user} has connected to Discord!')
         print(f'Bot is in {len(self.guilds)} servers')
         print('✅ Bot is ready! All commands have been synced.')
+        resume_pending_enrichments()
         print('Available commands:')
         print('- /setup - Configure bot settings (Admin only)')
         print('- /action - Create custom action messages')
+        print('- /bulkaction - Create action messages for up to 25 users')
+        print('- /history - Search past action messages')
         print('- /roblox - Get Roblox profile images')
         print('\nIMPORTANT: An administrator must run /setup first to:')
         print('1. Set the log channel for action messages')
@@ -62,110 +85,132 @@ class CustomBot(commands.Bot):
         print('- Presence Intent')
         print('in your Discord Developer Portal')
 
+    async def on_resumed(self):
+        resume_pending_enrichments()
+
 
 # Add after WebhookDatabase initialization
 bot_config_db = BotConfigDatabase()
+action_history_db = ActionHistoryDatabase()
+
+# Shared Roblox client with circuit breaker and avatar cache
+roblox_client = RobloxClient(max_concurrency=int(os.getenv('ROBLOX_MAX_CONCURRENCY', 8)))
 
-async def get_roblox_profile_image(username: str) -> Optional[str]:
+# Command rate limits, guild limits can be overridden per server through /setup
+rate_limiter = RateLimiter(
+    global_rate_per_minute=float(os.getenv('GLOBAL_RATE_PER_MINUTE', 300)),
+    global_burst=int(os.getenv('GLOBAL_RATE_BURST', 30)),
+    guild_rate_per_minute=float(os.getenv('GUILD_RATE_PER_MINUTE', 30)),
+    guild_burst=int(os.getenv('GUILD_RATE_BURST', 5))
+)
+
+# Total time a single command may spend waiting on Roblox
+ROBLOX_TIMEOUT_BUDGET = 10.0
+
+async def get_roblox_profile_image(username: str, budget: float = ROBLOX_TIMEOUT_BUDGET) -> Optional[str]:
     """Fetch Roblox profile image URL for a given username"""
-    # Configure timeout and retry settings
-    timeout = aiohttp.ClientTimeout(total=30, connect=10)
-    retry_attempts = 3
+    try:
+        return await roblox_client.get_profile_image(username, budget=budget)
+    except CircuitOpenError:
+        print(f"[Roblox API] Circuit open, skipping lookup for {username}")
+        raise
+    except RobloxAPIError as e:
+        print(f"[Roblox API] Lookup failed for {username}: {str(e)}")
+        return None
+
+async def acquire_rate_limit(interaction: discord.Interaction, config: Optional[tuple] = None) -> bool:
+    """Wait for a rate limit slot, telling the user to retry later if the queue is too long"""
+    if config is None and interaction.guild_id:
+        config = bot_config_db.get_config(str(interaction.guild_id))
+    rate_per_minute, burst = (config[3], config[4]) if config else (None, None)
+    try:
+        await rate_limiter.acquire(interaction.guild_id or f"user:{interaction.user.id}", rate_per_minute, burst)
+        return True
+    except RateLimitExceeded as e:
+        await interaction.followup.send(
+            f"⏳ Too many requests right now. Please try again in {e.retry_after:.0f} seconds.",
+            ephemeral=True
+        )
+        return False
 
-    for attempt in range(retry_attempts):
-        try:
-            conn = aiohttp.TCPConnector(
-                ssl=True,
-                verify_ssl=True,
-                use_dns_cache=True,
-                ttl_dns_cache=300,
-                family=0,  # Allow both IPv4 and IPv6
-                resolver=aiohttp.AsyncResolver()  # Use async DNS resolver
-            )
+bot = CustomBot()
 
-            async with aiohttp.ClientSession(connector=conn, timeout=timeout) as session:
-                # Add headers to mimic a browser request
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                    'Accept': 'application/json',
-                    'Accept-Language': 'en-US,en;q=0.9',
-                }
-
-                # First get user ID from username
-                user_api_url = f"https://users.roblox.com/v1/users/search?keyword={username}&limit=1"
-                print(f"[Roblox API] Attempt {attempt + 1}/{retry_attempts}")
-                print(f"[Roblox API] Requesting user data from: {user_api_url}")
-
-                async with session.get(user_api_url, headers=headers) as response:
-                    print(f"[Roblox API] User search status code: {response.status}")
-                    if response.status != 200:
-                        error_text = await response.text()
-                        print(f"[Roblox API] Error response: {error_text}")
-                        if attempt < retry_attempts - 1:
-                            continue
-                        return None
-
-                    data = await response.json()
-                    print(f"[Roblox API] User search response: {data}")
-                    if not data.get("data") or not data["data"]:
-                        print(f"[Roblox API] No user found for username: {username}")
-                        return None
-
-                    user_id = data["data"][0]["id"]
-                    print(f"[Roblox API] Found user ID: {user_id}")
-
-                # Then get the profile image using the newer thumbnails API with larger size
-                thumbnail_api_url = f"https://thumbnails.roblox.com/v1/users/avatar-headshot?userIds={user_id}&size=720x720&format=Png"
-                print(f"[Roblox API] Requesting thumbnail from: {thumbnail_api_url}")
-
-                async with session.get(thumbnail_api_url, headers=headers) as response:
-                    print(f"[Roblox API] Thumbnail status code: {response.status}")
-                    if response.status != 200:
-                        error_text = await response.text()
-                        print(f"[Roblox API] Error response: {error_text}")
-                        if attempt < retry_attempts - 1:
-                            continue
-                        return None
-
-                    data = await response.json()
-                    print(f"[Roblox API] Thumbnail response: {data}")
-                    if data.get("data") and data["data"]:
-                        image_url = data["data"][0].get("imageUrl")
-                        print(f"[Roblox API] Successfully retrieved image URL: {image_url}")
-                        return image_url
-
-            return None
-
-        except aiohttp.ClientConnectorError as e:
-            print(f"[Roblox API] Connection error (attempt {attempt + 1}): {str(e)}")
-            if attempt < retry_attempts - 1:
-                await asyncio.sleep(2 ** attempt)  # Exponential backoff
-                continue
-            print("[Roblox API] Failed to connect after all retries")
-            return None
+# message_id -> running enrichment task, so each log message is only patched once
+enrichment_tasks: Dict[int, asyncio.Task] = {}
 
-        except aiohttp.ClientError as e:
-            print(f"[Roblox API] Network error: {str(e)}")
-            return None
+async def enrich_action_message(channel_id: int, message_id: int, username: str, message: Optional[discord.Message] = None):
+    """Add the Roblox avatar (or a warning note) to an already posted action message"""
+    try:
+        if message is None:
+            channel = bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
+            message = await channel.fetch_message(message_id)
+        if not message.embeds:
+            bot_config_db.remove_pending_enrichment(str(message_id))
+            return
+        embed = message.embeds[0]
 
+        try:
+            print(f"Fetching Roblox profile for user: {username}")
+            profile_url = await get_roblox_profile_image(username)
+            if profile_url:
+                print(f"Successfully got profile image for {username}")
+                embed.set_image(url=profile_url)
+            else:
+                print(f"No profile image found for {username}")
+                embed.add_field(name="Note", value="⚠️ Could not fetch Roblox profile image", inline=False)
+        except CircuitOpenError:
+            embed.add_field(name="Note", value="⚠️ Roblox is currently unavailable, profile image skipped", inline=False)
+        except asyncio.TimeoutError:
+            print(f"Timeout while fetching profile image for {username}")
+            embed.add_field(name="Note", value="⚠️ Timed out while fetching Roblox profile image", inline=False)
         except Exception as e:
-            print(f"[Roblox API] Unexpected error: {str(e)}")
-            return None
+            print(f"Error fetching profile image: {str(e)}")
+            embed.add_field(name="Note", value="⚠️ Error fetching Roblox profile image", inline=False)
 
-bot = CustomBot()
+        await message.edit(embed=embed)
+        bot_config_db.remove_pending_enrichment(str(message_id))
+
+    except (discord.NotFound, discord.Forbidden):
+        # Message or channel is gone, nothing left to patch
+        bot_config_db.remove_pending_enrichment(str(message_id))
+    except Exception as e:
+        # Leave it pending so it is retried after the next reconnect
+        print(f"Failed to enrich action message {message_id}: {str(e)}")
+    finally:
+        enrichment_tasks.pop(message_id, None)
+
+def schedule_enrichment(channel_id: int, message_id: int, username: str, message: Optional[discord.Message] = None):
+    if message_id in enrichment_tasks:
+        return
+    bot_config_db.add_pending_enrichment(str(message_id), str(channel_id), username)
+    enrichment_tasks[message_id] = asyncio.create_task(
+        enrich_action_message(channel_id, message_id, username, message)
+    )
+
+def resume_pending_enrichments():
+    """Restart enrichments that were interrupted by a disconnect or restart"""
+    pending = bot_config_db.get_pending_enrichments()
+    for message_id, channel_id, username in pending:
+        schedule_enrichment(int(channel_id), int(message_id), username)
+    if pending:
+        print(f"Resumed {len(pending)} pending action enrichment(s)")
 
 @bot.tree.command(name="setup", description="Configure bot settings for your server")
 @app_commands.describe(
     log_channel="Department log channel",
     manage_role="The role that has access to commands",
-    al_message="Message to send when someone is put on Administrative Leave"
+    al_message="Message to send when someone is put on Administrative Leave",
+    rate_per_minute="Commands per minute this server may run (default 30)",
+    burst="Commands this server may run at once before the rate limit applies (default 5)"
 )
 @app_commands.checks.has_permissions(administrator=True)
 async def setup_bot(
     interaction: discord.Interaction,
     log_channel: discord.TextChannel,
     manage_role: discord.Role,
-    al_message: Optional[str] = None
+    al_message: Optional[str] = None,
+    rate_per_minute: Optional[app_commands.Range[int, 1, 600]] = None,
+    burst: Optional[app_commands.Range[int, 1, 50]] = None
 ):
     try:
         # Defer response since we'll be doing database operations
@@ -176,7 +221,9 @@ async def setup_bot(
             str(interaction.guild_id),
             str(log_channel.id),
             str(manage_role.id),
-            al_message
+            al_message,
+            rate_per_minute,
+            burst
         )
 
         if success:
@@ -201,6 +248,12 @@ async def setup_bot(
                     value=al_message,
                     inline=False
                 )
+            embed.add_field(
+                name="Rate Limit",
+                value=f"{rate_per_minute or rate_limiter.guild_rate_per_minute:g} commands/minute, "
+                      f"burst of {burst or rate_limiter.guild_burst}",
+                inline=False
+            )
 
             await interaction.followup.send(embed=embed, ephemeral=True)
         else:
@@ -288,6 +341,9 @@ async def custom_action(
             )
             return
 
+        if not await acquire_rate_limit(interaction, config):
+            return
+
         # Create initial embed with basic info
         color = color.lower()
         embed_color = COLOR_PRESETS.get(color, discord.Color.default())
@@ -313,36 +369,205 @@ async def custom_action(
             embed.add_field(name="Notes", value=notes, inline=False)
 
         # Add timestamp
-        embed.timestamp = datetime.utcnow()
+        embed.timestamp = datetime.now(timezone.utc)
+
+        # Post immediately, the Roblox avatar is patched in afterwards
+        message = await log_channel.send(embed=embed)
+        schedule_enrichment(message.channel.id, message.id, user, message)
 
-        # Fetch Roblox profile image in background with timeout
+        # Keep a local, searchable record for /history
+        action_history_db.add_action(
+            str(interaction.guild_id),
+            str(message.channel.id),
+            str(message.id),
+            user,
+            title,
+            action,
+            notes,
+            color,
+            str(interaction.user.id),
+            int(embed.timestamp.timestamp()),
+            custom_color=f"#{custom_color.lower()}" if color == 'default' and custom_color else None
+        )
+
+        # Send confirmation to the user
+        await interaction.followup.send("✅ Action message sent to the log channel!", ephemeral=True)
+
+    except Exception as e:
+        error_msg = f"❌ Error creating action message: {str(e)}"
+        print(error_msg)
         try:
-            print(f"Fetching Roblox profile for user: {user}")
-            profile_url = await asyncio.wait_for(
-                get_roblox_profile_image(user),
-                timeout=10.0
+            await interaction.followup.send(error_msg, ephemeral=True)
+        except:
+            if not interaction.response.is_done():
+                await interaction.response.send_message(error_msg, ephemeral=True)
+
+# Most users a single /bulkaction may target, and Discord's limit of embeds per message
+BULK_ACTION_MAX_USERS = 25
+EMBEDS_PER_MESSAGE = 10
+# Discord's limits on the combined text of a message's embeds, and on message content
+EMBED_CHARS_PER_MESSAGE = 6000
+MESSAGE_CHARS = 2000
+
+@bot.tree.command(name="bulkaction", description="Create the same action message for several Roblox users at once")
+@app_commands.describe(
+    users=f"Roblox usernames or userIDs, separated by commas or spaces (up to {BULK_ACTION_MAX_USERS})",
+    title="Action title e.g. Discipline Action, Employee Action",
+    action="e.g. has been **awarded** the **Award Commendation**",
+    color="Embed color (Aqua, Gold, Dark Gold, Green, Dark Green, Default)",
+    custom_color="Custom embed color, enter a HEX value. Used if color is set to Default",
+    notes="Notes"
+)
+@app_commands.choices(color=[
+    app_commands.Choice(name="Aqua", value="aqua"),
+    app_commands.Choice(name="Gold", value="gold"),
+    app_commands.Choice(name="Dark Gold", value="dark_gold"),
+    app_commands.Choice(name="Green", value="green"),
+    app_commands.Choice(name="Dark Green", value="dark_green"),
+    app_commands.Choice(name="Default", value="default"),
+])
+@checks.cooldown(1, 5.0)  # 1 use per 5 seconds
+@has_management_role()
+async def bulk_action(
+    interaction: discord.Interaction,
+    users: str,
+    title: str,
+    action: str,
+    color: str,
+    custom_color: Optional[str] = None,
+    notes: Optional[str] = None
+):
+    try:
+        await interaction.response.defer(ephemeral=True)
+
+        # Split on commas/whitespace and drop repeats (usernames are case-insensitive), keeping the given order
+        usernames, seen = [], set()
+        for name in re.split(r'[,\s]+', users):
+            if name and name.lower() not in seen:
+                seen.add(name.lower())
+                usernames.append(name)
+        print(f"Processing bulk action command for {len(usernames)} user(s)")
+        if not usernames:
+            await interaction.followup.send("❌ Please provide at least one Roblox username or userID.", ephemeral=True)
+            return
+        if len(usernames) > BULK_ACTION_MAX_USERS:
+            await interaction.followup.send(
+                f"❌ Too many users! A bulk action can target up to {BULK_ACTION_MAX_USERS} users, got {len(usernames)}.",
+                ephemeral=True
             )
-            if profile_url:
-                print(f"Successfully got profile image for {user}")
-                embed.set_image(url=profile_url)
+            return
+
+        config = bot_config_db.get_config(str(interaction.guild_id))
+        if not config:
+            await interaction.followup.send(
+                "❌ Server not configured! An administrator needs to run the /setup command first.",
+                ephemeral=True
+            )
+            return
+
+        log_channel = interaction.guild.get_channel(int(config[0]))
+        if not log_channel:
+            await interaction.followup.send(
+                "❌ Could not find the configured log channel. Please ask an administrator to run /setup again.",
+                ephemeral=True
+            )
+            return
+
+        color = color.lower()
+        embed_color = COLOR_PRESETS.get(color, discord.Color.default())
+        if color == 'default' and custom_color:
+            try:
+                custom_color = custom_color.strip('#')
+                embed_color = discord.Color(int(custom_color, 16))
+            except ValueError:
+                await interaction.followup.send("❌ Invalid HEX color format! Example: #FF0000", ephemeral=True)
+                return
+
+        if not await acquire_rate_limit(interaction, config):
+            return
+
+        # One batched lookup for everyone instead of a round trip per user
+        profile_urls, lookup_error = await roblox_client.get_profile_images(usernames, budget=ROBLOX_TIMEOUT_BUDGET)
+        if isinstance(lookup_error, CircuitOpenError):
+            lookup_note = "⚠️ Roblox is currently unavailable, profile image skipped"
+        elif isinstance(lookup_error, asyncio.TimeoutError):
+            lookup_note = "⚠️ Timed out while fetching Roblox profile image"
+        else:
+            lookup_note = "⚠️ Error fetching Roblox profile image"
+        if lookup_error:
+            print(f"[Roblox API] Bulk lookup failed: {str(lookup_error) or type(lookup_error).__name__}")
+
+        failures: Dict[str, str] = {}
+        timestamp = datetime.now(timezone.utc)
+        embeds = []
+        for username in usernames:
+            embed = discord.Embed(title=title, description=f"{username} {action}", color=embed_color)
+            if notes:
+                embed.add_field(name="Notes", value=notes, inline=False)
+            if username not in profile_urls:
+                embed.add_field(name="Note", value=lookup_note, inline=False)
+                failures[username] = "Roblox lookup failed, posted without profile image"
+            elif profile_urls[username]:
+                embed.set_image(url=profile_urls[username])
             else:
-                print(f"No profile image found for {user}")
                 embed.add_field(name="Note", value="⚠️ Could not fetch Roblox profile image", inline=False)
-        except asyncio.TimeoutError:
-            print(f"Timeout while fetching profile image for {user}")
-            embed.add_field(name="Note", value="⚠️ Timed out while fetching Roblox profile image", inline=False)
-        except Exception as e:
-            print(f"Error fetching profile image: {str(e)}")
-            embed.add_field(name="Note", value="⚠️ Error fetching Roblox profile image", inline=False)
+                failures[username] = "Roblox user not found, posted without profile image"
+            embed.timestamp = timestamp
+            embeds.append((username, embed))
+
+        # Pack embeds into messages without going over either per-message limit
+        groups = []
+        group_chars = 0
+        for username, embed in embeds:
+            if not groups or len(groups[-1]) == EMBEDS_PER_MESSAGE or group_chars + len(embed) > EMBED_CHARS_PER_MESSAGE:
+                groups.append([])
+                group_chars = 0
+            groups[-1].append((username, embed))
+            group_chars += len(embed)
+
+        posted = messages = 0
+        for group in groups:
+            try:
+                message = await log_channel.send(embeds=[embed for _, embed in group])
+            except discord.HTTPException as e:
+                print(f"Failed to post bulk action group: {str(e)}")
+                for username, _ in group:
+                    failures[username] = f"Not posted: {(e.text or str(e))[:200]}"
+                continue
 
-        # Send the embed to the log channel
-        await log_channel.send(embed=embed)
+            messages += 1
+            for username, _ in group:
+                posted += 1
+                action_history_db.add_action(
+                    str(interaction.guild_id),
+                    str(message.channel.id),
+                    str(message.id),
+                    username,
+                    title,
+                    action,
+                    notes,
+                    color,
+                    str(interaction.user.id),
+                    int(timestamp.timestamp()),
+                    custom_color=f"#{custom_color.lower()}" if color == 'default' and custom_color else None
+                )
 
-        # Send confirmation to the user
-        await interaction.followup.send("✅ Action message sent to the log channel!", ephemeral=True)
+        summary = f"✅ Posted {posted} action(s) in {messages} message(s) to the log channel!"
+        if not posted:
+            summary = "❌ Could not post any of the action messages."
+        if failures:
+            summary += "\n\n**Issues:**"
+            lines = [f"- `{username[:100]}`: {reason}" for username, reason in failures.items()]
+            for shown, line in enumerate(lines):
+                more = f"\n…and {len(lines) - shown} more"
+                if len(summary) + 1 + len(line) + (len(more) if shown < len(lines) - 1 else 0) > MESSAGE_CHARS:
+                    summary += more
+                    break
+                summary += "\n" + line
+        await interaction.followup.send(summary, ephemeral=True)
 
     except Exception as e:
-        error_msg = f"❌ Error creating action message: {str(e)}"
+        error_msg = f"❌ Error creating bulk action messages: {str(e)}"
         print(error_msg)
         try:
             await interaction.followup.send(error_msg, ephemeral=True)
@@ -350,11 +575,115 @@ async def custom_action(
             if not interaction.response.is_done():
                 await interaction.response.send_message(error_msg, ephemeral=True)
 
+# Number of actions shown per /history page
+HISTORY_PAGE_SIZE = 10
+
+def parse_history_date(value: str) -> datetime:
+    """Parse a YYYY-MM-DD date as midnight UTC"""
+    return datetime.strptime(value.strip(), "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+class HistoryView(discord.ui.View):
+    """Pages through /history results using keyset cursors"""
+
+    def __init__(self, author_id: int, guild_id: int, filters: dict):
+        super().__init__(timeout=300)
+        self.author_id = author_id
+        self.guild_id = guild_id
+        self.filters = filters
+        # Cursor at the start of every page visited so far, None for the first page
+        self.cursors = [None]
+        self.next_cursor = None
+
+    def load_page(self) -> discord.Embed:
+        rows = action_history_db.search_actions(
+            str(self.guild_id),
+            before=self.cursors[-1],
+            limit=HISTORY_PAGE_SIZE + 1,
+            **self.filters
+        )
+        has_more = len(rows) > HISTORY_PAGE_SIZE
+        rows = rows[:HISTORY_PAGE_SIZE]
+        self.next_cursor = (rows[-1][6], rows[-1][0]) if has_more else None
+        self.newer_button.disabled = len(self.cursors) == 1
+        self.older_button.disabled = self.next_cursor is None
+
+        embed = discord.Embed(title="Action History", color=discord.Color.blue())
+        if not rows:
+            embed.description = "No actions found."
+        for action_id, user, title, action, notes, color, created_at, channel_id, message_id in rows:
+            value = f"**{user}** {action[:300]}"
+            if notes:
+                value += f"\nNotes: {notes[:200]}"
+            value += f"\n<t:{created_at}:f>"
+            if channel_id and message_id:
+                value += f" · [Jump](https://discord.com/channels/{self.guild_id}/{channel_id}/{message_id})"
+            embed.add_field(name=f"#{action_id} · {title[:200]}", value=value[:1024], inline=False)
+        embed.set_footer(text=f"Page {len(self.cursors)}")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.author_id
+
+    @discord.ui.button(label="◀ Newer", style=discord.ButtonStyle.secondary)
+    async def newer_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.cursors.pop()
+        await interaction.response.edit_message(embed=self.load_page(), view=self)
+
+    @discord.ui.button(label="Older ▶", style=discord.ButtonStyle.secondary)
+    async def older_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.cursors.append(self.next_cursor)
+        await interaction.response.edit_message(embed=self.load_page(), view=self)
+
+@bot.tree.command(name="history", description="Search past action messages")
+@app_commands.describe(
+    user="Only show actions for this Roblox username or userID",
+    search="Search text in user, title, action and notes",
+    color="Only show actions with this color",
+    since="Start date (YYYY-MM-DD)",
+    until="End date, inclusive (YYYY-MM-DD)"
+)
+@app_commands.choices(color=[
+    app_commands.Choice(name="Aqua", value="aqua"),
+    app_commands.Choice(name="Gold", value="gold"),
+    app_commands.Choice(name="Dark Gold", value="dark_gold"),
+    app_commands.Choice(name="Green", value="green"),
+    app_commands.Choice(name="Dark Green", value="dark_green"),
+    app_commands.Choice(name="Default", value="default"),
+])
+@has_management_role()
+async def action_history(
+    interaction: discord.Interaction,
+    user: Optional[str] = None,
+    search: Optional[str] = None,
+    color: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+):
+    try:
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            start = int(parse_history_date(since).timestamp()) if since else None
+            end = int((parse_history_date(until) + timedelta(days=1)).timestamp()) if until else None
+        except ValueError:
+            await interaction.followup.send("❌ Invalid date format! Example: 2024-01-31", ephemeral=True)
+            return
+
+        filters = {'query': search, 'user': user, 'color': color, 'start': start, 'end': end}
+        view = HistoryView(interaction.user.id, interaction.guild_id, filters)
+        await interaction.followup.send(embed=view.load_page(), view=view, ephemeral=True)
+
+    except Exception as e:
+        await interaction.followup.send(f"❌ Error searching action history: {str(e)}", ephemeral=True)
+        print(f"History command error: {str(e)}")
+
 @bot.tree.command(name="roblox", description="Get Roblox profile image for a username")
 @app_commands.describe(username="The Roblox username to look up")
 async def roblox_profile(interaction: discord.Interaction, username: str):
     try:
         await interaction.response.defer()
+        if not await acquire_rate_limit(interaction):
+            return
         profile_url = await get_roblox_profile_image(username)
         if profile_url:
             embed = discord.Embed(title=f"Roblox Profile: {username}", color=discord.Color.blue())
@@ -362,6 +691,10 @@ async def roblox_profile(interaction: discord.Interaction, username: str):
             await interaction.followup.send(embed=embed)
         else:
             await interaction.followup.send(f"❌ Couldn't find Roblox profile for username: {username}")
+    except CircuitOpenError:
+        await interaction.followup.send("❌ Roblox is currently unavailable. Please try again in a moment.")
+    except asyncio.TimeoutError:
+        await interaction.followup.send(f"❌ Timed out while fetching Roblox profile for username: {username}")
     except Exception as e:
         await interaction.followup.send(f"❌ Error fetching Roblox profile: {str(e)}")
         print(f"Roblox API error for username {username}: {str(e)}")
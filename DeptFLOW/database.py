@@ -1,26 +1,87 @@
 import sqlite3
+import queue
+import threading
+import time
+import zlib
+from contextlib import contextmanager
 from datetime import datetime, date
+import numpy as np
 import pandas as pd
 from typing import Optional, List, Tuple
 
+class ConnectionPool:
+    """Pooled SQLite connections for multi-threaded use
+
+    Reads borrow one of several WAL-mode connections, so they never wait on
+    another thread's write. Writes go through a single connection behind a
+    lock, which serializes them without holding up readers.
+    """
+
+    def __init__(self, path: str, size: int = 4):
+        self.path = path
+        self._readers = queue.Queue()
+        for _ in range(size):
+            self._readers.put(self._connect())
+        self._writer = self._connect()
+        self._write_lock = threading.Lock()
+        # time.monotonic() of the last read or write, used to find idle periods
+        self.last_used = time.monotonic()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    @contextmanager
+    def read(self):
+        self.last_used = time.monotonic()
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    @contextmanager
+    def write(self):
+        self.last_used = time.monotonic()
+        with self._write_lock:
+            with self._writer:
+                yield self._writer
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(path: str) -> ConnectionPool:
+    """Return the process-wide pool for a database file"""
+    with _pools_lock:
+        if path not in _pools:
+            _pools[path] = ConnectionPool(path)
+        return _pools[path]
+
+
 class HabitDatabase:
-    def __init__(self):
-        self.conn = sqlite3.connect('habits.db', check_same_thread=False)
+    def __init__(self, owner: str = 'default', path: str = 'habits.db'):
+        self.owner = owner
+        self.pool = get_pool(path)
         self.create_tables()
 
     def create_tables(self):
-        with self.conn:
-            self.conn.execute('''
+        with self.pool.write() as conn:
+            conn.execute('''
                 CREATE TABLE IF NOT EXISTS habits (
                     id INTEGER PRIMARY KEY,
+                    owner TEXT NOT NULL DEFAULT 'default',
                     name TEXT NOT NULL,
                     created_date DATE DEFAULT CURRENT_DATE
                 )
             ''')
 
-            self.conn.execute('''
+            conn.execute('''
                 CREATE TABLE IF NOT EXISTS habit_logs (
                     id INTEGER PRIMARY KEY,
+                    owner TEXT NOT NULL DEFAULT 'default',
                     habit_id INTEGER,
                     date DATE,
                     completed BOOLEAN,
@@ -29,38 +90,62 @@ class HabitDatabase:
                 )
             ''')
 
+            # Databases created before habits were partitioned by user
+            for table in ('habits', 'habit_logs'):
+                columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+                if 'owner' not in columns:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN owner TEXT NOT NULL DEFAULT 'default'")
+
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_habits_owner ON habits (owner, id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_habit_logs_owner_habit_date ON habit_logs (owner, habit_id, date)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_habit_logs_owner_date ON habit_logs (owner, date)')
+
+            # Logs past the retention cutoff, one zlib-compressed pair of year bitmaps per habit
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS habit_logs_archive (
+                    owner TEXT NOT NULL,
+                    habit_id INTEGER NOT NULL,
+                    year INTEGER NOT NULL,
+                    payload BLOB NOT NULL,
+                    PRIMARY KEY (owner, habit_id, year)
+                ) WITHOUT ROWID
+            ''')
+
     def add_habit(self, name):
-        with self.conn:
-            cursor = self.conn.execute(
-                'INSERT INTO habits (name) VALUES (?)',
-                (name,)
+        with self.pool.write() as conn:
+            cursor = conn.execute(
+                'INSERT INTO habits (owner, name) VALUES (?, ?)',
+                (self.owner, name)
             )
             return cursor.lastrowid
 
     def get_habits(self):
-        query = 'SELECT id, name, created_date FROM habits'
-        return pd.read_sql_query(query, self.conn)
+        query = 'SELECT id, name, created_date FROM habits WHERE owner = ?'
+        with self.pool.read() as conn:
+            return pd.read_sql_query(query, conn, params=(self.owner,))
 
     def delete_habit(self, habit_id):
-        with self.conn:
-            self.conn.execute('DELETE FROM habit_logs WHERE habit_id = ?', (habit_id,))
-            self.conn.execute('DELETE FROM habits WHERE id = ?', (habit_id,))
+        with self.pool.write() as conn:
+            conn.execute('DELETE FROM habit_logs WHERE owner = ? AND habit_id = ?', (self.owner, habit_id))
+            conn.execute('DELETE FROM habit_logs_archive WHERE owner = ? AND habit_id = ?', (self.owner, habit_id))
+            conn.execute('DELETE FROM habits WHERE owner = ? AND id = ?', (self.owner, habit_id))
 
     def log_habit(self, habit_id, date, completed):
-        with self.conn:
-            self.conn.execute('''
-                INSERT OR REPLACE INTO habit_logs (habit_id, date, completed)
-                VALUES (?, ?, ?)
-            ''', (habit_id, date, completed))
+        # Only log against habits this user owns
+        with self.pool.write() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO habit_logs (owner, habit_id, date, completed)
+                SELECT owner, id, ?, ? FROM habits WHERE owner = ? AND id = ?
+            ''', (date, completed, self.owner, habit_id))
 
     def get_habit_logs(self, habit_id=None, start_date=None, end_date=None):
         query = '''
             SELECT h.name, hl.date, hl.completed
             FROM habits h
-            LEFT JOIN habit_logs hl ON h.id = hl.habit_id
-            WHERE 1=1
+            LEFT JOIN habit_logs hl ON hl.owner = h.owner AND hl.habit_id = h.id
+            WHERE h.owner = ?
         '''
-        params = []
+        params = [self.owner]
 
         if habit_id:
             query += ' AND h.id = ?'
@@ -72,30 +157,459 @@ class HabitDatabase:
             query += ' AND hl.date <= ?'
             params.append(end_date)
 
-        return pd.read_sql_query(query, self.conn, params=params)
+        with self.pool.read() as conn:
+            logs = pd.read_sql_query(query, conn, params=params)
+            archived = self._archived_logs(conn, habit_id, start_date, end_date)
+        if archived.empty:
+            return logs
 
-    def get_streak_data(self, habit_id):
+        names = self.get_habits().set_index('id')['name']
+        archived['name'] = archived['habit_id'].map(names)
+        archived = archived.dropna(subset=['name'])[['name', 'date', 'completed']]
+        # Habits whose only logs are archived shouldn't also show up as having none
+        logs = logs[logs['date'].notna() | ~logs['name'].isin(archived['name'])]
+        # A live log for an archived day (a late edit) wins over the archive
+        return pd.concat([archived, logs], ignore_index=True).drop_duplicates(['name', 'date'], keep='last')
+
+    def _archived_logs(self, conn, habit_id=None, start_date=None, end_date=None):
+        """Archived logs as a habit_id/date/completed frame, in the row engine's format"""
+        sql = 'SELECT habit_id, year, payload FROM habit_logs_archive WHERE owner = ?'
+        params = [self.owner]
+        start_day = _to_day_number(start_date) if start_date else None
+        end_day = _to_day_number(end_date) if end_date else None
+        if habit_id:
+            sql += ' AND habit_id = ?'
+            params.append(int(habit_id))
+        if start_day is not None:
+            sql += ' AND year >= ?'
+            params.append(date.fromordinal(start_day).year)
+        if end_day is not None:
+            sql += ' AND year <= ?'
+            params.append(date.fromordinal(end_day).year)
+
+        frames = []
+        for archived_habit_id, year, payload in conn.execute(sql, params):
+            completed, logged = _decode_archive(year, payload)
+            days = np.flatnonzero(logged) + date(year, 1, 1).toordinal()
+            completed = completed[logged]
+            in_range = np.ones(len(days), dtype=bool)
+            if start_day is not None:
+                in_range &= days >= start_day
+            if end_day is not None:
+                in_range &= days <= end_day
+            frames.append(pd.DataFrame({
+                'habit_id': archived_habit_id,
+                'date': _day_strings(days[in_range]),
+                'completed': completed[in_range].astype(int),
+            }))
+        if not frames:
+            return pd.DataFrame(columns=['habit_id', 'date', 'completed'])
+        return pd.concat(frames, ignore_index=True)
+
+    def _habit_log_frame(self, conn, habit_id, start_date=None, end_date=None):
+        """A habit's live and archived logs as a date/completed frame, in date order"""
+        date_sql, date_params = self._date_filter(start_date, end_date)
         logs = pd.read_sql_query(
-            'SELECT date, completed FROM habit_logs WHERE habit_id = ? ORDER BY date',
-            self.conn,
-            params=(habit_id,)
+            'SELECT date, completed FROM habit_logs WHERE owner = ? AND habit_id = ?' + date_sql + ' ORDER BY date',
+            conn,
+            params=[self.owner, habit_id] + date_params
         )
-        if logs.empty:
-            return 0, 0
+        archived = self._archived_logs(conn, habit_id, start_date, end_date)
+        if archived.empty:
+            return logs
+        logs = pd.concat([archived[['date', 'completed']], logs], ignore_index=True)
+        return logs.drop_duplicates('date', keep='last').sort_values('date', kind='stable')
+
+    def get_streak_data(self, habit_id):
+        with self.pool.read() as conn:
+            logs = self._habit_log_frame(conn, habit_id)
+        return _streaks(logs['completed'].astype(bool).to_numpy())
 
-        current_streak = 0
-        max_streak = 0
-        current_count = 0
+    def archive_logs(self, cutoff) -> int:
+        """Move every user's logs dated before cutoff into the compressed archive
 
-        for _, row in logs.iterrows():
-            if row['completed']:
-                current_count += 1
-                max_streak = max(max_streak, current_count)
+        Archived logs stay visible to get_habit_logs and the analytics methods.
+        Returns the number of log rows moved.
+        """
+        cutoff = date.fromordinal(_to_day_number(cutoff))
+        with self.pool.write() as conn:
+            rows = conn.execute(
+                'SELECT owner, habit_id, date, completed FROM habit_logs WHERE date < ?', (cutoff,)
+            ).fetchall()
+            if not rows:
+                return 0
+
+            for (owner, habit_id, year), (completed, logged) in _pack_logs(rows).items():
+                existing = conn.execute(
+                    'SELECT payload FROM habit_logs_archive WHERE owner = ? AND habit_id = ? AND year = ?',
+                    (owner, habit_id, year)
+                ).fetchone()
+                if existing:
+                    # Newly archived days take precedence over what was archived before
+                    old_completed, old_logged = _decode_archive_bits(existing[0])
+                    completed |= old_completed & ~logged
+                    logged |= old_logged
+                conn.execute(
+                    'INSERT OR REPLACE INTO habit_logs_archive (owner, habit_id, year, payload) VALUES (?, ?, ?, ?)',
+                    (owner, habit_id, year, _encode_archive(completed, logged))
+                )
+            conn.execute('DELETE FROM habit_logs WHERE date < ?', (cutoff,))
+        return len(rows)
+
+    def _date_filter(self, start_date, end_date):
+        sql, params = '', []
+        if start_date:
+            sql += ' AND date >= ?'
+            params.append(start_date)
+        if end_date:
+            sql += ' AND date <= ?'
+            params.append(end_date)
+        return sql, params
+
+    def get_completion_rate(self, habit_id, start_date=None, end_date=None) -> float:
+        """Fraction of logged days that were completed"""
+        date_sql, date_params = self._date_filter(start_date, end_date)
+        with self.pool.read() as conn:
+            if not self._archived_logs(conn, habit_id, start_date, end_date).empty:
+                logs = self._habit_log_frame(conn, habit_id, start_date, end_date)
+                return float(logs['completed'].mean()) if not logs.empty else 0.0
+            row = conn.execute(
+                'SELECT AVG(completed) FROM habit_logs WHERE owner = ? AND habit_id = ?' + date_sql,
+                [self.owner, habit_id] + date_params
+            ).fetchone()
+        return float(row[0]) if row[0] is not None else 0.0
+
+    def get_weekday_pattern(self, habit_id, start_date=None, end_date=None) -> List[Optional[float]]:
+        """Completion rate per weekday, Monday first, None for weekdays with no logs"""
+        date_sql, date_params = self._date_filter(start_date, end_date)
+        with self.pool.read() as conn:
+            if not self._archived_logs(conn, habit_id, start_date, end_date).empty:
+                # Same shape as the SQL below, computed over live and archived logs together
+                logs = self._habit_log_frame(conn, habit_id, start_date, end_date)
+                sunday_first = (pd.to_datetime(logs['date']).dt.weekday + 1) % 7
+                rows = logs['completed'].groupby(sunday_first).mean().items()
             else:
-                current_count = 0
+                rows = conn.execute(
+                    "SELECT strftime('%w', date), AVG(completed) FROM habit_logs WHERE owner = ? AND habit_id = ?"
+                    + date_sql + " GROUP BY 1",
+                    [self.owner, habit_id] + date_params
+                ).fetchall()
+        pattern = [None] * 7
+        for weekday, rate in rows:
+            # strftime('%w') counts from Sunday
+            pattern[(int(weekday) + 6) % 7] = float(rate)
+        return pattern
+
+    def get_completion_matrix(self, start_date, end_date):
+        """All of the user's habits over a date range as habits x days arrays
+
+        Returns (habits, days, completed, logged): the habits frame, the day
+        numbers of the columns, and boolean matrices of check-ins and logged days.
+        """
+        habits = self.get_habits()
+        start_day, end_day = _to_day_number(start_date), _to_day_number(end_date)
+        days = np.arange(start_day, end_day + 1)
+        completed = np.zeros((len(habits), len(days)), dtype=bool)
+        logged = np.zeros((len(habits), len(days)), dtype=bool)
+
+        with self.pool.read() as conn:
+            logs = pd.read_sql_query(
+                'SELECT habit_id, date, completed FROM habit_logs WHERE owner = ? AND date >= ? AND date <= ?',
+                conn,
+                params=(self.owner, date.fromordinal(start_day), date.fromordinal(end_day))
+            )
+            archived = self._archived_logs(conn, None, start_date, end_date)
+        if not archived.empty:
+            logs = pd.concat([archived, logs], ignore_index=True).drop_duplicates(['habit_id', 'date'], keep='last')
+        if logs.empty or habits.empty:
+            return habits, days, completed, logged
+
+        habit_ids = habits['id'].to_numpy()
+        logs = logs[logs['habit_id'].isin(habit_ids)]
+        order = np.argsort(habit_ids)
+        rows = order[np.searchsorted(habit_ids, logs['habit_id'].to_numpy(), sorter=order)]
+        log_days = pd.to_datetime(logs['date']).to_numpy().astype('datetime64[D]').astype(np.int64) + _EPOCH_DAY
+        columns = log_days - start_day
+        logged[rows, columns] = True
+        completed[rows, columns] = logs['completed'].to_numpy().astype(bool)
+        return habits, days, completed, logged
+
+
+# Day number of 1970-01-01, for converting numpy datetime64[D] values
+_EPOCH_DAY = date(1970, 1, 1).toordinal()
+
+# Bytes in one year bitmap: 366 bits, enough for a leap year
+_YEAR_BYTES = 46
+
+
+def _to_day_number(value) -> int:
+    """Convert a date, datetime or YYYY-MM-DD string to a proleptic Gregorian ordinal"""
+    if isinstance(value, datetime):
+        value = value.date()
+    elif isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return value.toordinal()
+
+
+def _day_strings(days: np.ndarray) -> np.ndarray:
+    """Day numbers to YYYY-MM-DD strings, the format the row engine stores"""
+    return np.datetime_as_string((days - _EPOCH_DAY).astype('datetime64[D]'))
+
+
+def _unpack_year(year: int, blob: bytes) -> np.ndarray:
+    """One bool per day of the year from a year bitmap"""
+    days_in_year = date(year + 1, 1, 1).toordinal() - date(year, 1, 1).toordinal()
+    return np.unpackbits(np.frombuffer(blob, dtype=np.uint8), bitorder='little')[:days_in_year].astype(bool)
+
+
+def _pack_logs(rows) -> dict:
+    """Fold (owner, habit_id, date, completed) rows into {(owner, habit_id, year): [completed, logged]} bit ints"""
+    bitmaps = {}
+    for owner, habit_id, day, completed in rows:
+        day_number = _to_day_number(day)
+        year = date.fromordinal(day_number).year
+        bits = bitmaps.setdefault((owner, habit_id, year), [0, 0])
+        mask = 1 << (day_number - date(year, 1, 1).toordinal())
+        bits[1] |= mask
+        if completed:
+            bits[0] |= mask
+    return bitmaps
+
+
+def _encode_archive(completed: int, logged: int) -> bytes:
+    return zlib.compress(completed.to_bytes(_YEAR_BYTES, 'little') + logged.to_bytes(_YEAR_BYTES, 'little'))
+
+
+def _decode_archive_bits(payload: bytes) -> Tuple[int, int]:
+    raw = zlib.decompress(payload)
+    return int.from_bytes(raw[:_YEAR_BYTES], 'little'), int.from_bytes(raw[_YEAR_BYTES:], 'little')
+
+
+def _decode_archive(year: int, payload: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    raw = zlib.decompress(payload)
+    return _unpack_year(year, raw[:_YEAR_BYTES]), _unpack_year(year, raw[_YEAR_BYTES:])
+
+
+def _streaks(values: np.ndarray) -> Tuple[int, int]:
+    """Current and longest run of True values"""
+    if not len(values):
+        return 0, 0
+    edges = np.diff(np.concatenate(([0], values.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if not len(starts):
+        return 0, 0
+    runs = ends - starts
+    current_streak = int(runs[-1]) if ends[-1] == len(values) else 0
+    return current_streak, int(runs.max())
+
+
+class BitsetHabitDatabase(HabitDatabase):
+    """Habit storage that packs each habit's year of logs into two bitmaps
+
+    Bit i of a year's blob is day `date(year, 1, 1).toordinal() + i`. The
+    `completed` bitmap holds the check-ins, `logged` marks which days were
+    recorded at all, so a missing day and an unchecked day stay distinct.
+    """
+
+    YEAR_BYTES = _YEAR_BYTES
+
+    def create_tables(self):
+        super().create_tables()
+        with self.pool.write() as conn:
+            existed = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'habit_bitmaps'"
+            ).fetchone()
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS habit_bitmaps (
+                    owner TEXT NOT NULL,
+                    habit_id INTEGER NOT NULL,
+                    year INTEGER NOT NULL,
+                    completed BLOB NOT NULL,
+                    logged BLOB NOT NULL,
+                    PRIMARY KEY (owner, habit_id, year)
+                ) WITHOUT ROWID
+            ''')
+            if not existed:
+                self._import_row_logs(conn)
+
+    def _import_row_logs(self, conn):
+        """Pack logs written by the row-based engine, live and archived, into bitmaps"""
+        bitmaps = _pack_logs(conn.execute(
+            'SELECT owner, habit_id, date, completed FROM habit_logs WHERE date IS NOT NULL'
+        ))
+        for owner, habit_id, year, payload in conn.execute(
+            'SELECT owner, habit_id, year, payload FROM habit_logs_archive'
+        ):
+            completed, logged = _decode_archive_bits(payload)
+            bits = bitmaps.setdefault((owner, habit_id, year), [0, 0])
+            bits[0] |= completed & ~bits[1]
+            bits[1] |= logged
+        conn.executemany(
+            'INSERT OR REPLACE INTO habit_bitmaps (owner, habit_id, year, completed, logged) VALUES (?, ?, ?, ?, ?)',
+            [
+                (owner, habit_id, year, completed.to_bytes(self.YEAR_BYTES, 'little'), logged.to_bytes(self.YEAR_BYTES, 'little'))
+                for (owner, habit_id, year), (completed, logged) in bitmaps.items()
+            ]
+        )
+
+    def delete_habit(self, habit_id):
+        habit_id = int(habit_id)
+        with self.pool.write() as conn:
+            conn.execute('DELETE FROM habit_bitmaps WHERE owner = ? AND habit_id = ?', (self.owner, habit_id))
+            conn.execute('DELETE FROM habit_logs_archive WHERE owner = ? AND habit_id = ?', (self.owner, habit_id))
+            conn.execute('DELETE FROM habits WHERE owner = ? AND id = ?', (self.owner, habit_id))
+
+    def log_habit(self, habit_id, date_value, completed):
+        habit_id = int(habit_id)
+        day_number = _to_day_number(date_value)
+        year = date.fromordinal(day_number).year
+        mask = 1 << (day_number - date(year, 1, 1).toordinal())
+
+        with self.pool.write() as conn:
+            # Only log against habits this user owns
+            if not conn.execute('SELECT 1 FROM habits WHERE owner = ? AND id = ?', (self.owner, habit_id)).fetchone():
+                return
+            row = conn.execute(
+                'SELECT completed, logged FROM habit_bitmaps WHERE owner = ? AND habit_id = ? AND year = ?',
+                (self.owner, habit_id, year)
+            ).fetchone()
+            completed_bits = int.from_bytes(row[0], 'little') if row else 0
+            logged_bits = (int.from_bytes(row[1], 'little') if row else 0) | mask
+            completed_bits = completed_bits | mask if completed else completed_bits & ~mask
+            conn.execute(
+                'INSERT OR REPLACE INTO habit_bitmaps (owner, habit_id, year, completed, logged) VALUES (?, ?, ?, ?, ?)',
+                (self.owner, habit_id, year,
+                 completed_bits.to_bytes(self.YEAR_BYTES, 'little'),
+                 logged_bits.to_bytes(self.YEAR_BYTES, 'little'))
+            )
+
+    def archive_logs(self, cutoff) -> int:
+        """Bitmaps are already compact, so there is nothing to archive"""
+        return 0
+
+    def _load_bitmaps(self, conn, habit_ids=None, start_day=None, end_day=None):
+        sql = 'SELECT habit_id, year, completed, logged FROM habit_bitmaps WHERE owner = ?'
+        params = [self.owner]
+        if habit_ids is not None:
+            sql += f" AND habit_id IN ({', '.join('?' * len(habit_ids))})"
+            params.extend(int(habit_id) for habit_id in habit_ids)
+        if start_day is not None:
+            sql += ' AND year >= ?'
+            params.append(date.fromordinal(start_day).year)
+        if end_day is not None:
+            sql += ' AND year <= ?'
+            params.append(date.fromordinal(end_day).year)
+        return conn.execute(sql + ' ORDER BY habit_id, year', params).fetchall()
+
+    def _unpack(self, year, blob):
+        return _unpack_year(year, blob)
+
+    def _habit_days(self, habit_id, start_date=None, end_date=None):
+        """Day numbers and completion flags of a habit's logged days, in date order"""
+        start_day = _to_day_number(start_date) if start_date else None
+        end_day = _to_day_number(end_date) if end_date else None
+        with self.pool.read() as conn:
+            rows = self._load_bitmaps(conn, [habit_id], start_day, end_day)
+
+        day_chunks, completed_chunks = [], []
+        for _, year, completed, logged in rows:
+            logged_bits = self._unpack(year, logged)
+            days = np.flatnonzero(logged_bits) + date(year, 1, 1).toordinal()
+            day_chunks.append(days)
+            completed_chunks.append(self._unpack(year, completed)[logged_bits])
+        if not day_chunks:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=bool)
+
+        days = np.concatenate(day_chunks)
+        completed = np.concatenate(completed_chunks)
+        in_range = np.ones(len(days), dtype=bool)
+        if start_day is not None:
+            in_range &= days >= start_day
+        if end_day is not None:
+            in_range &= days <= end_day
+        return days[in_range], completed[in_range]
+
+    def get_habit_logs(self, habit_id=None, start_date=None, end_date=None):
+        habits = self.get_habits()
+        if habit_id:
+            habits = habits[habits['id'] == habit_id]
+
+        frames = []
+        for _, habit in habits.iterrows():
+            days, completed = self._habit_days(habit['id'], start_date, end_date)
+            if len(days):
+                frames.append(pd.DataFrame({'name': habit['name'], 'date': _day_strings(days), 'completed': completed.astype(int)}))
+            elif not start_date and not end_date:
+                # Match the LEFT JOIN: habits without logs still show up once
+                frames.append(pd.DataFrame({'name': [habit['name']], 'date': [None], 'completed': [None]}))
+
+        if not frames:
+            return pd.DataFrame(columns=['name', 'date', 'completed'])
+        return pd.concat(frames, ignore_index=True)
+
+    def get_streak_data(self, habit_id):
+        _, completed = self._habit_days(habit_id)
+        return _streaks(completed)
+
+    def get_completion_matrix(self, start_date, end_date):
+        habits = self.get_habits()
+        start_day, end_day = _to_day_number(start_date), _to_day_number(end_date)
+        days = np.arange(start_day, end_day + 1)
+        completed = np.zeros((len(habits), len(days)), dtype=bool)
+        logged = np.zeros((len(habits), len(days)), dtype=bool)
+
+        with self.pool.read() as conn:
+            rows = self._load_bitmaps(conn, None, start_day, end_day)
+        row_of = {habit_id: i for i, habit_id in enumerate(habits['id'])}
+
+        # Copy each year's bits into its slice of the matrix
+        for habit_id, year, completed_blob, logged_blob in rows:
+            if habit_id not in row_of:
+                continue
+            year_start = date(year, 1, 1).toordinal()
+            year_bits = slice(max(start_day - year_start, 0), min(end_day - year_start + 1, date(year + 1, 1, 1).toordinal() - year_start))
+            if year_bits.stop <= year_bits.start:
+                continue
+            columns = slice(year_start + year_bits.start - start_day, year_start + year_bits.stop - start_day)
+            logged[row_of[habit_id], columns] = self._unpack(year, logged_blob)[year_bits]
+            completed[row_of[habit_id], columns] = self._unpack(year, completed_blob)[year_bits]
+        return habits, days, completed & logged, logged
+
+    def _count_bits(self, habit_id, start_date=None, end_date=None):
+        """Popcount of completed and logged days, masked to the date range"""
+        start_day = _to_day_number(start_date) if start_date else None
+        end_day = _to_day_number(end_date) if end_date else None
+        with self.pool.read() as conn:
+            rows = self._load_bitmaps(conn, [habit_id], start_day, end_day)
+
+        completed_total = logged_total = 0
+        for _, year, completed, logged in rows:
+            year_start = date(year, 1, 1).toordinal()
+            low = max(start_day - year_start, 0) if start_day is not None else 0
+            high = min(end_day - year_start, self.YEAR_BYTES * 8 - 1) if end_day is not None else self.YEAR_BYTES * 8 - 1
+            if high < low:
+                continue
+            range_mask = ((1 << (high - low + 1)) - 1) << low
+            logged_bits = int.from_bytes(logged, 'little') & range_mask
+            completed_total += (int.from_bytes(completed, 'little') & logged_bits).bit_count()
+            logged_total += logged_bits.bit_count()
+        return completed_total, logged_total
 
-        current_streak = current_count
-        return current_streak, max_streak
+    def get_completion_rate(self, habit_id, start_date=None, end_date=None) -> float:
+        completed, logged = self._count_bits(habit_id, start_date, end_date)
+        return completed / logged if logged else 0.0
+
+    def get_weekday_pattern(self, habit_id, start_date=None, end_date=None) -> List[Optional[float]]:
+        days, completed = self._habit_days(habit_id, start_date, end_date)
+        # Ordinal 1 (0001-01-01) was a Monday
+        weekdays = (days - 1) % 7
+        logged_counts = np.bincount(weekdays, minlength=7)
+        completed_counts = np.bincount(weekdays, weights=completed, minlength=7)
+        return [
+            float(completed_counts[i] / logged_counts[i]) if logged_counts[i] else None
+            for i in range(7)
+        ]
 
 
 class WebhookDatabase:
@@ -225,26 +739,231 @@ class BotConfigDatabase:
                     guild_id TEXT PRIMARY KEY,
                     log_channel_id TEXT NOT NULL,
                     manage_role_id TEXT NOT NULL,
-                    al_message TEXT
+                    al_message TEXT,
+                    rate_per_minute INTEGER,
+                    burst INTEGER
                 )
             ''')
 
-    def save_config(self, guild_id: str, log_channel_id: str, manage_role_id: str, al_message: str = None) -> bool:
+            # Configs saved before per-guild rate limits existed
+            columns = [row[1] for row in self.conn.execute('PRAGMA table_info(bot_config)')]
+            for column in ('rate_per_minute', 'burst'):
+                if column not in columns:
+                    self.conn.execute(f'ALTER TABLE bot_config ADD COLUMN {column} INTEGER')
+
+            # Action log messages still waiting for their Roblox avatar
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS pending_enrichments (
+                    message_id TEXT PRIMARY KEY,
+                    channel_id TEXT NOT NULL,
+                    username TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+    def save_config(self, guild_id: str, log_channel_id: str, manage_role_id: str, al_message: str = None,
+                    rate_per_minute: int = None, burst: int = None) -> bool:
         try:
             with self.conn:
                 self.conn.execute('''
                     INSERT OR REPLACE INTO bot_config 
-                    (guild_id, log_channel_id, manage_role_id, al_message)
-                    VALUES (?, ?, ?, ?)
-                ''', (guild_id, log_channel_id, manage_role_id, al_message))
+                    (guild_id, log_channel_id, manage_role_id, al_message, rate_per_minute, burst)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (guild_id, log_channel_id, manage_role_id, al_message, rate_per_minute, burst))
             return True
         except sqlite3.Error:
             return False
 
-    def get_config(self, guild_id: str) -> Optional[Tuple[str, str, str]]:
+    def get_config(self, guild_id: str) -> Optional[Tuple[str, str, str, Optional[int], Optional[int]]]:
         cursor = self.conn.execute(
-            'SELECT log_channel_id, manage_role_id, al_message FROM bot_config WHERE guild_id = ?',
+            'SELECT log_channel_id, manage_role_id, al_message, rate_per_minute, burst FROM bot_config WHERE guild_id = ?',
             (guild_id,)
         )
         result = cursor.fetchone()
-        return result if result else None
\ No newline at end of file
+        return result if result else None
+
+    def add_pending_enrichment(self, message_id: str, channel_id: str, username: str) -> bool:
+        """Record an action message whose avatar still has to be patched in"""
+        try:
+            with self.conn:
+                self.conn.execute(
+                    'INSERT OR IGNORE INTO pending_enrichments (message_id, channel_id, username) VALUES (?, ?, ?)',
+                    (message_id, channel_id, username)
+                )
+            return True
+        except sqlite3.Error:
+            return False
+
+    def remove_pending_enrichment(self, message_id: str) -> bool:
+        try:
+            with self.conn:
+                self.conn.execute('DELETE FROM pending_enrichments WHERE message_id = ?', (message_id,))
+            return True
+        except sqlite3.Error:
+            return False
+
+    def get_pending_enrichments(self, max_age_hours: int = 24) -> List[Tuple[str, str, str]]:
+        """List pending enrichments, dropping any older than max_age_hours"""
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM pending_enrichments WHERE created_at < datetime('now', ?)",
+                (f'-{max_age_hours} hours',)
+            )
+        cursor = self.conn.execute(
+            'SELECT message_id, channel_id, username FROM pending_enrichments ORDER BY created_at'
+        )
+        return cursor.fetchall()
+
+
+
+class ActionHistoryDatabase:
+    def __init__(self):
+        self.conn = sqlite3.connect('action_history.db', check_same_thread=False)
+        self.create_tables()
+
+    def create_tables(self):
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS actions (
+                    id INTEGER PRIMARY KEY,
+                    guild_id TEXT NOT NULL,
+                    channel_id TEXT,
+                    message_id TEXT,
+                    user TEXT NOT NULL COLLATE NOCASE,
+                    title TEXT NOT NULL,
+                    action TEXT NOT NULL,
+                    notes TEXT,
+                    color TEXT,
+                    custom_color TEXT,
+                    created_by TEXT,
+                    created_at INTEGER NOT NULL
+                )
+            ''')
+
+            # Older rows stored a Default action's hex in color, which hid them from color:Default
+            columns = [row[1] for row in self.conn.execute('PRAGMA table_info(actions)')]
+            if 'custom_color' not in columns:
+                self.conn.execute('ALTER TABLE actions ADD COLUMN custom_color TEXT')
+                self.conn.execute(
+                    "UPDATE actions SET custom_color = color, color = 'default' WHERE color LIKE '#%'"
+                )
+
+            # Every lookup is scoped to a guild and paged newest first on (created_at, id)
+            self.conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_actions_guild_time ON actions (guild_id, created_at, id)'
+            )
+            self.conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_actions_guild_user_time ON actions (guild_id, user, created_at, id)'
+            )
+            self.conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_actions_guild_color_time ON actions (guild_id, color, created_at, id)'
+            )
+
+            # Full-text index kept in sync with the actions table by triggers
+            self.conn.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS actions_fts USING fts5(
+                    user, title, action, notes,
+                    content='actions', content_rowid='id'
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS actions_ai AFTER INSERT ON actions BEGIN
+                    INSERT INTO actions_fts (rowid, user, title, action, notes)
+                    VALUES (new.id, new.user, new.title, new.action, new.notes);
+                END
+            ''')
+            self.conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS actions_ad AFTER DELETE ON actions BEGIN
+                    INSERT INTO actions_fts (actions_fts, rowid, user, title, action, notes)
+                    VALUES ('delete', old.id, old.user, old.title, old.action, old.notes);
+                END
+            ''')
+            self.conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS actions_au AFTER UPDATE ON actions BEGIN
+                    INSERT INTO actions_fts (actions_fts, rowid, user, title, action, notes)
+                    VALUES ('delete', old.id, old.user, old.title, old.action, old.notes);
+                    INSERT INTO actions_fts (rowid, user, title, action, notes)
+                    VALUES (new.id, new.user, new.title, new.action, new.notes);
+                END
+            ''')
+
+    def add_action(self, guild_id: str, channel_id: str, message_id: str, user: str, title: str,
+                   action: str, notes: Optional[str], color: Optional[str], created_by: str,
+                   created_at: int, custom_color: Optional[str] = None) -> Optional[int]:
+        """Record a posted action message
+
+        `color` is the preset name, `custom_color` the hex used with the Default preset.
+        """
+        try:
+            with self.conn:
+                cursor = self.conn.execute(
+                    '''INSERT INTO actions
+                       (guild_id, channel_id, message_id, user, title, action, notes, color, custom_color,
+                        created_by, created_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                    (guild_id, channel_id, message_id, user, title, action, notes, color, custom_color,
+                     created_by, created_at)
+                )
+                return cursor.lastrowid
+        except sqlite3.Error:
+            return None
+
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        # Quote every term so user input can't break the FTS5 syntax, and prefix-match it
+        terms = [term.replace('"', '""') for term in text.split()]
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def search_actions(
+        self,
+        guild_id: str,
+        query: Optional[str] = None,
+        user: Optional[str] = None,
+        color: Optional[str] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        before: Optional[Tuple[int, int]] = None,
+        limit: int = 10
+    ) -> List[Tuple]:
+        """Search a guild's action history, newest first
+
+        Pages are keyset based: pass the (created_at, id) of the last row of the
+        previous page as `before` to get the next one.
+        Rows are (id, user, title, action, notes, color, created_at, channel_id, message_id).
+        """
+        sql = '''
+            SELECT a.id, a.user, a.title, a.action, a.notes, a.color, a.created_at, a.channel_id, a.message_id
+            FROM actions a
+        '''
+        sql += ' WHERE a.guild_id = ?'
+        params = [guild_id]
+
+        if query and query.strip():
+            # Run the FTS match once as a subquery, a join would probe the index for every row in the guild
+            sql += ' AND a.id IN (SELECT rowid FROM actions_fts WHERE actions_fts MATCH ?)'
+            params.append(self._fts_query(query))
+
+        if user:
+            sql += ' AND a.user = ?'
+            params.append(user)
+        if color:
+            sql += ' AND a.color = ?'
+            params.append(color)
+        if start is not None:
+            sql += ' AND a.created_at >= ?'
+            params.append(start)
+        if end is not None:
+            sql += ' AND a.created_at < ?'
+            params.append(end)
+        if before is not None:
+            sql += ' AND (a.created_at, a.id) < (?, ?)'
+            params.extend(before)
+
+        sql += ' ORDER BY a.created_at DESC, a.id DESC LIMIT ?'
+        params.append(limit)
+
+        try:
+            return self.conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            print(f"Action history search error: {str(e)}")
+            return []
@@ -1,10 +1,20 @@
-from database import HabitDatabase
+import os
+from database import HabitDatabase, BitsetHabitDatabase, get_pool
+from maintenance import MaintenanceScheduler
 from datetime import datetime, timedelta
 import pandas as pd
 
+# Storage engines selectable through the HABIT_STORAGE environment variable
+STORAGE_ENGINES = {
+    'rows': HabitDatabase,
+    'bitset': BitsetHabitDatabase,
+}
+
 class HabitManager:
-    def __init__(self):
-        self.db = HabitDatabase()
+    def __init__(self, owner='default', engine=None):
+        self.owner = owner
+        engine = engine or os.getenv('HABIT_STORAGE', 'rows')
+        self.db = STORAGE_ENGINES[engine](owner)
 
     def create_habit(self, name):
         return self.db.add_habit(name)
@@ -26,5 +36,28 @@ class HabitManager:
     def get_streaks(self, habit_id):
         return self.db.get_streak_data(habit_id)
 
+    def get_completion_rate(self, habit_id, days=30):
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=days)
+        return self.db.get_completion_rate(habit_id, start_date, end_date)
+
+    def get_overview_data(self, days=30):
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=days)
+        return self.db.get_completion_matrix(start_date, end_date)
+
     def export_data(self):
         return self.db.get_habit_logs()
+
+def create_maintenance_scheduler(path='habits.db'):
+    """Maintenance for the habit database, archiving logs past HABIT_LOG_RETENTION_DAYS"""
+    retention_days = int(os.getenv('HABIT_LOG_RETENTION_DAYS', 365))
+    pool = get_pool(path)
+
+    def archive_old_logs():
+        cutoff = datetime.now().date() - timedelta(days=retention_days)
+        moved = HabitDatabase(path=path).archive_logs(cutoff)
+        if moved:
+            print(f"[Maintenance] Archived {moved} habit log(s) older than {cutoff}")
+
+    return MaintenanceScheduler([path], lambda: pool.last_used, jobs=[archive_old_logs])
@@ -0,0 +1,315 @@
+"""Local load test for the bot's /action, /bulkaction and /roblox command paths.
+
+Runs the real handlers from bot.py against fake Discord objects and a local
+stub of the Roblox users/thumbnails APIs, then reports throughput and latency
+percentiles. Nothing talks to Discord or Roblox.
+
+Example:
+    python loadtest.py --command action --requests 500 --concurrency 50 --latency-ms 150 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+from aiohttp import web
+
+GUILD_ID = 1
+LOG_CHANNEL_ID = 10
+MANAGE_ROLE_ID = 100
+
+
+class StubRobloxServer:
+    """Stands in for users.roblox.com and thumbnails.roblox.com with injectable latency and errors"""
+
+    def __init__(self, latency_ms: float = 100.0, jitter_ms: float = 50.0, error_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post('/v1/usernames/users', self.usernames_users)
+        app.router.add_get('/v1/users/avatar-headshot', self.avatar_headshot)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _simulate(self) -> Optional[web.Response]:
+        self.requests += 1
+        delay = max(self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms), 0)
+        await asyncio.sleep(delay / 1000)
+        if random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"errors": [{"message": "Injected failure"}]}, status=503)
+        return None
+
+    @staticmethod
+    def _user_id(name: str) -> int:
+        return int(name) if name.isdigit() else abs(hash(name.lower())) % 10 ** 9
+
+    async def usernames_users(self, request: web.Request) -> web.Response:
+        error = await self._simulate()
+        if error:
+            return error
+        body = await request.json()
+        return web.json_response({"data": [
+            {"requestedUsername": name, "id": self._user_id(name), "name": name}
+            for name in body.get("usernames", [])
+        ]})
+
+    async def avatar_headshot(self, request: web.Request) -> web.Response:
+        error = await self._simulate()
+        if error:
+            return error
+        user_ids = [user_id for user_id in request.query.get('userIds', '').split(',') if user_id]
+        return web.json_response({"data": [
+            {
+                "targetId": int(user_id),
+                "state": "Completed",
+                "imageUrl": f"https://tr.rbxcdn.com/{user_id}/720/720/AvatarHeadshot/Png",
+            }
+            for user_id in user_ids
+        ]})
+
+
+class FakeRole:
+    def __init__(self, role_id: int):
+        self.id = role_id
+
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.roles = [FakeRole(MANAGE_ROLE_ID)]
+
+
+class FakeMessage:
+    _ids = itertools.count(1)
+
+    def __init__(self, channel: "FakeChannel", content=None, embed=None, embeds=None):
+        self.id = next(self._ids)
+        self.channel = channel
+        self.content = content
+        self.embeds = [embed] if embed is not None else list(embeds or [])
+        self.created_at = time.perf_counter()
+        self.edited_at: Optional[float] = None
+
+    async def edit(self, content=None, embed=None, embeds=None):
+        if embed is not None:
+            self.embeds = [embed]
+        elif embeds is not None:
+            self.embeds = list(embeds)
+        self.edited_at = time.perf_counter()
+        return self
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+        self.mention = f"<#{channel_id}>"
+        self.messages: List[FakeMessage] = []
+
+    async def send(self, content=None, embed=None, embeds=None):
+        message = FakeMessage(self, content, embed, embeds)
+        self.messages.append(message)
+        return message
+
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        return next(message for message in self.messages if message.id == message_id)
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int, channel: FakeChannel):
+        self.id = guild_id
+        self._channels = {channel.id: channel}
+
+    def get_channel(self, channel_id: int) -> Optional[FakeChannel]:
+        return self._channels.get(channel_id)
+
+
+class FakeInteractionResponse:
+    def __init__(self):
+        self._done = False
+        self.messages = []
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def defer(self, ephemeral: bool = False, thinking: bool = False):
+        self._done = True
+
+    async def send_message(self, content=None, embed=None, ephemeral: bool = False, view=None):
+        self._done = True
+        self.messages.append(content or embed)
+
+
+class FakeFollowup:
+    def __init__(self, channel: FakeChannel):
+        self.channel = channel
+        self.messages = []
+
+    async def send(self, content=None, embed=None, embeds=None, ephemeral: bool = False, view=None):
+        self.messages.append(content or embed or embeds)
+        return FakeMessage(self.channel, content, embed, embeds)
+
+
+class FakeInteraction:
+    def __init__(self, guild: FakeGuild, user_id: int):
+        self.guild = guild
+        self.guild_id = guild.id
+        self.user = FakeUser(user_id)
+        self.response = FakeInteractionResponse()
+        self.followup = FakeFollowup(FakeChannel(0))
+
+
+def percentile_report(label: str, latencies: List[float]) -> str:
+    if not latencies:
+        return f"{label}: no samples"
+    if len(latencies) == 1:
+        p50 = p95 = p99 = latencies[0]
+    else:
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    return (
+        f"{label}: p50 {p50 * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms, "
+        f"p99 {p99 * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms"
+    )
+
+
+async def run_load_test(bot_module, args) -> None:
+    server = StubRobloxServer(args.latency_ms, args.jitter_ms, args.error_rate)
+    base_url = await server.start()
+    bot_module.roblox_client.users_api_url = base_url
+    bot_module.roblox_client.thumbnails_api_url = base_url
+
+    channels, guilds = [], []
+    for i in range(args.guilds):
+        channel = FakeChannel(LOG_CHANNEL_ID + i)
+        channels.append(channel)
+        guilds.append(FakeGuild(GUILD_ID + i, channel))
+        bot_module.bot_config_db.save_config(
+            str(GUILD_ID + i), str(channel.id), str(MANAGE_ROLE_ID), None, args.rate_per_minute, args.burst
+        )
+
+    usernames = [f"LoadTestUser{i}" for i in range(args.users)]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    failures = 0
+    rate_limited = 0
+
+    async def invoke(i: int):
+        nonlocal failures, rate_limited
+        interaction = FakeInteraction(guilds[i % len(guilds)], user_id=1000 + i)
+        username = usernames[i % len(usernames)]
+        async with semaphore:
+            started = time.perf_counter()
+            if args.command == 'action':
+                await bot_module.custom_action.callback(
+                    interaction,
+                    user=username,
+                    title="Employee Action",
+                    action="has been **promoted** to **Senior Officer**",
+                    color="green"
+                )
+            elif args.command == 'bulk':
+                await bot_module.bulk_action.callback(
+                    interaction,
+                    users=", ".join(usernames[(i + j) % len(usernames)] for j in range(args.bulk_size)),
+                    title="Employee Action",
+                    action="has been **promoted** to **Senior Officer**",
+                    color="green"
+                )
+            else:
+                await bot_module.roblox_profile.callback(interaction, username=username)
+            latencies.append(time.perf_counter() - started)
+        replies = [message for message in interaction.followup.messages if isinstance(message, str)]
+        if any(message.startswith("❌") or "\n**Issues:**" in message for message in replies):
+            failures += 1
+        elif any(message.startswith("⏳") for message in replies):
+            rate_limited += 1
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output if not args.verbose else sys.stdout):
+        started = time.perf_counter()
+        await asyncio.gather(*(invoke(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+        # Let the background avatar enrichments finish so their latency can be reported
+        while bot_module.enrichment_tasks:
+            await asyncio.gather(*list(bot_module.enrichment_tasks.values()), return_exceptions=True)
+        await bot_module.roblox_client.close()
+    await server.stop()
+
+    print(f"Command:      /{args.command}")
+    print(f"Requests:     {args.requests} at concurrency {args.concurrency} ({args.users} distinct users, {args.guilds} guild(s))")
+    print(f"Roblox stub:  {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms latency, {args.error_rate:.0%} error rate")
+    print(f"Elapsed:      {elapsed:.2f} s")
+    print(f"Throughput:   {args.requests / elapsed:.1f} commands/s")
+    print(f"Failures:     {failures}")
+    print(f"Rate limited: {rate_limited}")
+    print(f"Stub calls:   {server.requests} ({server.errors} injected errors)")
+    print(f"Breaker:      {bot_module.roblox_client.breaker.state}")
+    print(percentile_report("Response latency", latencies))
+    if args.command == 'action':
+        enriched = [
+            message.edited_at - message.created_at
+            for channel in channels for message in channel.messages if message.edited_at
+        ]
+        print(percentile_report("Avatar enrichment", enriched))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the bot's command handlers against a local Roblox stub")
+    parser.add_argument('--command', choices=['action', 'bulk', 'roblox'], default='action')
+    parser.add_argument('--requests', type=int, default=200, help="Total command invocations")
+    parser.add_argument('--concurrency', type=int, default=20, help="Invocations in flight at once")
+    parser.add_argument('--users', type=int, default=50, help="Distinct Roblox usernames to cycle through")
+    parser.add_argument('--bulk-size', type=int, default=25, help="Users per /bulkaction invocation")
+    parser.add_argument('--guilds', type=int, default=1, help="Guilds to spread the invocations over")
+    parser.add_argument('--rate-per-minute', type=int, default=None, help="Per-guild rate limit, as set through /setup")
+    parser.add_argument('--burst', type=int, default=None, help="Per-guild burst, as set through /setup")
+    parser.add_argument('--global-rate-per-minute', type=int, default=None, help="Overrides GLOBAL_RATE_PER_MINUTE")
+    parser.add_argument('--global-burst', type=int, default=None, help="Overrides GLOBAL_RATE_BURST")
+    parser.add_argument('--latency-ms', type=float, default=100.0, help="Mean stub response latency")
+    parser.add_argument('--jitter-ms', type=float, default=50.0, help="Uniform jitter around the latency")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of stub responses that fail with 503")
+    parser.add_argument('--verbose', action='store_true', help="Show the bot's own log output")
+    args = parser.parse_args()
+
+    # bot.py reads the global rate limits from the environment when it is imported
+    if args.global_rate_per_minute:
+        os.environ['GLOBAL_RATE_PER_MINUTE'] = str(args.global_rate_per_minute)
+    if args.global_burst:
+        os.environ['GLOBAL_RATE_BURST'] = str(args.global_burst)
+
+    # bot.py opens its SQLite files relative to the working directory, keep them out of the repo
+    bot_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, bot_dir)
+    os.chdir(tempfile.mkdtemp(prefix="deptflow-loadtest-"))
+    bot_module = importlib.import_module('bot')
+
+    asyncio.run(run_load_test(bot_module, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+def maintain_database(path: str, vacuum_pages: int = 1000) -> Dict[str, int]:
+    """Run one round of housekeeping on a SQLite file
+
+    Switches the file to incremental auto-vacuum the first time (this needs a
+    one-off full VACUUM), then frees up to `vacuum_pages` unused pages,
+    refreshes planner statistics and truncates the WAL if there is one.
+    Returns the file size before and after, in bytes.
+    """
+    size_before = os.path.getsize(path) if os.path.exists(path) else 0
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    try:
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            print(f"[Maintenance] Enabling incremental vacuum on {path}")
+            conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            conn.execute('VACUUM')
+        conn.execute(f'PRAGMA incremental_vacuum({int(vacuum_pages)})')
+
+        # First run has no statistics yet, after that PRAGMA optimize only re-analyzes what changed
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+            conn.execute('ANALYZE')
+        conn.execute('PRAGMA optimize')
+
+        if conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal':
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    finally:
+        conn.close()
+
+    size_after = os.path.getsize(path)
+    print(f"[Maintenance] {path}: {size_before} -> {size_after} bytes")
+    return {'size_before': size_before, 'size_after': size_after}
+
+
+class MaintenanceScheduler:
+    """Background thread that runs database housekeeping while the app is idle
+
+    Every `interval` seconds it waits until `last_activity()` is at least
+    `idle_after` seconds in the past, then runs the `jobs` (e.g. log
+    retention) followed by maintain_database on each path.
+    """
+
+    def __init__(
+        self,
+        db_paths: List[str],
+        last_activity: Callable[[], float],
+        jobs: Optional[List[Callable[[], None]]] = None,
+        interval: float = 6 * 3600,
+        idle_after: float = 300,
+        poll_every: float = 60
+    ):
+        self.db_paths = db_paths
+        self.last_activity = last_activity
+        self.jobs = jobs or []
+        self.interval = interval
+        self.idle_after = idle_after
+        self.poll_every = poll_every
+        self.last_run = float('-inf')
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="db-maintenance", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def is_idle(self) -> bool:
+        return time.monotonic() - self.last_activity() >= self.idle_after
+
+    def run_once(self):
+        for job in self.jobs:
+            try:
+                job()
+            except Exception as e:
+                print(f"[Maintenance] Job {getattr(job, '__name__', job)} failed: {str(e)}")
+        for path in self.db_paths:
+            if not os.path.exists(path):
+                continue
+            try:
+                maintain_database(path)
+            except sqlite3.Error as e:
+                # Usually a busy database, it is retried on the next round
+                print(f"[Maintenance] Skipped {path}: {str(e)}")
+        self.last_run = time.monotonic()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_every):
+            if time.monotonic() - self.last_run >= self.interval and self.is_idle():
+                self.run_once()
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from typing import Dict, Hashable, Optional
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to queue for longer than allowed"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket that lets callers reserve tokens ahead of time
+
+    The balance may go negative: each reservation beyond the available tokens
+    queues behind the previous ones, and the caller sleeps for the returned delay.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def configure(self, rate: float, capacity: float):
+        if rate != self.rate or capacity != self.capacity:
+            self._refill(time.monotonic())
+            self.rate = rate
+            self.capacity = capacity
+            self.tokens = min(self.tokens, capacity)
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a newly reserved token would be available"""
+        self._refill(now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def reserve(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+
+class RateLimiter:
+    """Per-guild token buckets behind a shared global bucket"""
+
+    def __init__(
+        self,
+        global_rate_per_minute: float = 300,
+        global_burst: int = 30,
+        guild_rate_per_minute: float = 30,
+        guild_burst: int = 5,
+        max_wait: float = 10.0
+    ):
+        self.global_bucket = TokenBucket(global_rate_per_minute / 60, global_burst)
+        self.guild_rate_per_minute = guild_rate_per_minute
+        self.guild_burst = guild_burst
+        self.max_wait = max_wait
+        self._guild_buckets: Dict[Hashable, TokenBucket] = {}
+
+    def _guild_bucket(self, guild_id: Hashable, rate_per_minute: Optional[float], burst: Optional[int]) -> TokenBucket:
+        rate = (rate_per_minute or self.guild_rate_per_minute) / 60
+        capacity = burst or self.guild_burst
+        bucket = self._guild_buckets.get(guild_id)
+        if bucket is None:
+            bucket = self._guild_buckets[guild_id] = TokenBucket(rate, capacity)
+        else:
+            bucket.configure(rate, capacity)
+        return bucket
+
+    async def acquire(self, guild_id: Hashable, rate_per_minute: Optional[float] = None, burst: Optional[int] = None):
+        """Wait for a slot for this guild, or raise RateLimitExceeded if the queue is too long
+
+        rate_per_minute and burst override the default guild limits, e.g. from /setup.
+        """
+        now = time.monotonic()
+        guild_bucket = self._guild_bucket(guild_id, rate_per_minute, burst)
+        wait = max(guild_bucket.wait_time(now), self.global_bucket.wait_time(now))
+        if wait > self.max_wait:
+            raise RateLimitExceeded(wait)
+
+        guild_bucket.reserve(now)
+        self.global_bucket.reserve(now)
+        if wait > 0:
+            await asyncio.sleep(wait)
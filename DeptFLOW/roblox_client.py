@@ -0,0 +1,375 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+USERS_API_URL = "https://users.roblox.com"
+THUMBNAILS_API_URL = "https://thumbnails.roblox.com"
+
+# Most user IDs the thumbnails API accepts in one request
+THUMBNAIL_BATCH_SIZE = 100
+
+# 4xx statuses that mean Roblox is overloaded rather than that the request was bad
+RETRYABLE_CLIENT_STATUSES = {408, 429}
+
+# Headers to mimic a browser request
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/json',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+
+class RobloxAPIError(Exception):
+    """Raised when a Roblox API call fails (bad status, network error or timeout)"""
+
+
+class RobloxClientError(RobloxAPIError):
+    """Raised when Roblox rejects the request itself (4xx other than 408/429), e.g. a filtered username
+
+    Roblox is up when this happens, so it is neither retried nor counted by the circuit breaker.
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(RobloxAPIError):
+    """Raised when the circuit breaker is rejecting calls to Roblox"""
+
+
+class CircuitBreaker:
+    """Fail fast after repeated failures, then let a single probe through once the reset timeout passes"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be made right now"""
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            print("[Roblox API] Circuit half-open, probing Roblox")
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        # Half-open: only one probe at a time
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            print("[Roblox API] Circuit closed, Roblox is responding again")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self._probe_in_flight = False
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                print(f"[Roblox API] Circuit opened after {self.failures} failure(s)")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class RobloxClient:
+    """Roblox avatar lookups guarded by a circuit breaker and a stale-while-revalidate cache"""
+
+    def __init__(
+        self,
+        users_api_url: str = USERS_API_URL,
+        thumbnails_api_url: str = THUMBNAILS_API_URL,
+        breaker: Optional[CircuitBreaker] = None,
+        cache_ttl: float = 300.0,
+        cache_size: int = 1024,
+        request_timeout: float = 30.0,
+        retry_attempts: int = 3,
+        max_concurrency: int = 8
+    ):
+        self.users_api_url = users_api_url.rstrip('/')
+        self.thumbnails_api_url = thumbnails_api_url.rstrip('/')
+        self.breaker = breaker or CircuitBreaker()
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.request_timeout = request_timeout
+        self.retry_attempts = retry_attempts
+        # username (lowercase) -> (image_url, fetched_at)
+        self._cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        # Lookups already in flight, shared by concurrent callers for the same username
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Bounds HTTP requests to Roblox in flight across all commands
+        self._request_slots = asyncio.Semaphore(max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            conn = aiohttp.TCPConnector(
+                use_dns_cache=True,
+                ttl_dns_cache=300,
+                family=0,  # Allow both IPv4 and IPv6
+                resolver=aiohttp.AsyncResolver()  # Use async DNS resolver
+            )
+            self._session = aiohttp.ClientSession(connector=conn, headers=DEFAULT_HEADERS)
+        return self._session
+
+    async def close(self):
+        for task in self._refreshing.values():
+            task.cancel()
+        self._refreshing.clear()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def get_cached(self, username: str) -> Optional[str]:
+        """Return the last known image URL for a username, however old"""
+        cached = self._cache.get(username.lower())
+        return cached[0] if cached else None
+
+    def _store(self, key: str, image_url: str):
+        self._cache[key] = (image_url, time.monotonic())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _request_json(self, session: aiohttp.ClientSession, method: str, url: str, deadline: float, payload=None):
+        async with self._request_slots:
+            # Time spent queueing for a slot comes out of the same budget
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                raise RobloxAPIError("Timeout budget exhausted")
+
+            timeout = aiohttp.ClientTimeout(total=min(self.request_timeout, remaining), connect=min(10, remaining))
+            async with session.request(method, url, json=payload, timeout=timeout) as response:
+                print(f"[Roblox API] {url} status code: {response.status}")
+                if response.status != 200:
+                    error_text = await response.text()
+                    print(f"[Roblox API] Error response: {error_text}")
+                    if 400 <= response.status < 500 and response.status not in RETRYABLE_CLIENT_STATUSES:
+                        raise RobloxClientError(response.status, f"Roblox API rejected the request with status {response.status}")
+                    raise RobloxAPIError(f"Roblox API returned status {response.status}")
+                try:
+                    return await response.json()
+                except (aiohttp.ContentTypeError, ValueError) as e:
+                    raise RobloxAPIError(f"Roblox API returned a malformed response: {str(e)}") from e
+
+    async def _retrying(self, operation, deadline: float):
+        """Run operation(session), retrying failures with exponential backoff until the deadline"""
+        loop = asyncio.get_running_loop()
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self.retry_attempts):
+            try:
+                print(f"[Roblox API] Attempt {attempt + 1}/{self.retry_attempts}")
+                session = await self._get_session()
+                return await operation(session)
+
+            except RobloxClientError:
+                # Retrying would get the same answer
+                raise
+
+            except (RobloxAPIError, aiohttp.ClientConnectorError, aiohttp.ServerTimeoutError, asyncio.TimeoutError) as e:
+                last_error = e
+                print(f"[Roblox API] Request failed (attempt {attempt + 1}): {str(e)}")
+
+            except aiohttp.ClientError as e:
+                print(f"[Roblox API] Network error: {str(e)}")
+                raise RobloxAPIError(str(e)) from e
+
+            except (KeyError, IndexError, TypeError, AttributeError, ValueError) as e:
+                # JSON that doesn't have the shape we expect, treated like any other bad response
+                last_error = RobloxAPIError(f"Unexpected Roblox API response: {e!r}")
+                print(f"[Roblox API] Request failed (attempt {attempt + 1}): {str(last_error)}")
+
+            # Exponential backoff, but never past the deadline
+            backoff = 2 ** attempt
+            if attempt == self.retry_attempts - 1 or loop.time() + backoff >= deadline:
+                break
+            await asyncio.sleep(backoff)
+
+        print("[Roblox API] Failed after all retries")
+        raise RobloxAPIError(str(last_error) if last_error else "Roblox API unavailable")
+
+    async def fetch_profile_image(self, username: str, deadline: float) -> Optional[str]:
+        """Fetch the profile image URL straight from Roblox, retrying until the deadline
+
+        Resolved exactly like fetch_profile_images, since both fill the same cache.
+        Returns None if the user does not exist or the username is rejected as
+        invalid, raises RobloxAPIError if Roblox is failing.
+        """
+        images = await self.fetch_profile_images([username], deadline)
+        return images[username]
+
+    async def fetch_profile_images(self, usernames: List[str], deadline: float) -> Dict[str, Optional[str]]:
+        """Fetch profile image URLs for many users with one users call and one thumbnails call
+
+        All-digit entries are taken as user IDs, the rest are matched as exact
+        usernames. Users that don't exist map to None.
+        """
+        async def lookup(session: aiohttp.ClientSession) -> Dict[str, Optional[str]]:
+            user_ids = {name: int(name) for name in usernames if name.isdigit()}
+            # Usernames are case-insensitive: look each one up once, answer every spelling asked for
+            names: Dict[str, List[str]] = {}
+            for name in usernames:
+                if not name.isdigit():
+                    names.setdefault(name.lower(), []).append(name)
+
+            if names:
+                requested_names = [spellings[0] for spellings in names.values()]
+                try:
+                    data = await self._request_json(
+                        session, 'POST', f"{self.users_api_url}/v1/usernames/users", deadline,
+                        {"usernames": requested_names, "excludeBannedUsers": False}
+                    )
+                except RobloxClientError as e:
+                    if e.status != 400:
+                        raise
+                    print(f"[Roblox API] Usernames rejected by Roblox: {', '.join(requested_names)}")
+                    data = {}
+                for entry in data.get("data", []):
+                    for name in names.get(entry.get("requestedUsername", "").lower(), []):
+                        user_ids[name] = entry["id"]
+                print(f"[Roblox API] Resolved {len(user_ids)}/{len(usernames)} user(s)")
+
+            image_urls = {}
+            ids = sorted(set(user_ids.values()))
+            for i in range(0, len(ids), THUMBNAIL_BATCH_SIZE):
+                batch = ','.join(str(user_id) for user_id in ids[i:i + THUMBNAIL_BATCH_SIZE])
+                thumbnail_api_url = f"{self.thumbnails_api_url}/v1/users/avatar-headshot?userIds={batch}&size=720x720&format=Png"
+                try:
+                    data = await self._request_json(session, 'GET', thumbnail_api_url, deadline)
+                except RobloxClientError as e:
+                    if e.status != 400:
+                        raise
+                    print(f"[Roblox API] User IDs rejected by Roblox: {batch}")
+                    continue
+                for entry in data.get("data", []):
+                    image_urls[entry.get("targetId")] = entry.get("imageUrl")
+
+            return {name: image_urls.get(user_ids.get(name)) for name in usernames}
+
+        return await self._retrying(lookup, deadline)
+
+    async def _through_breaker(self, fetch, budget: float):
+        """Run fetch(deadline) within the budget, feeding the outcome to the circuit breaker"""
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("Roblox API is temporarily unavailable")
+
+        deadline = asyncio.get_running_loop().time() + budget
+        try:
+            result = await asyncio.wait_for(fetch(deadline), timeout=budget)
+        except RobloxClientError:
+            # Roblox answered, the request itself was bad
+            self.breaker.record_success()
+            raise
+        except (RobloxAPIError, asyncio.TimeoutError):
+            self.breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            # Give a cancelled half-open probe back so the next caller can try
+            self.breaker._probe_in_flight = False
+            raise
+        except Exception:
+            # Anything unexpected still has to settle the breaker, or a half-open probe never ends
+            self.breaker.record_failure()
+            raise
+
+        self.breaker.record_success()
+        return result
+
+    async def _fetch_through_breaker(self, username: str, budget: float) -> Optional[str]:
+        image_url = await self._through_breaker(lambda deadline: self.fetch_profile_image(username, deadline), budget)
+        if image_url:
+            self._store(username.lower(), image_url)
+        return image_url
+
+    def _schedule_refresh(self, username: str, budget: float):
+        key = username.lower()
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                await self._fetch_through_breaker(username, budget)
+            except (RobloxAPIError, asyncio.TimeoutError) as e:
+                print(f"[Roblox API] Background refresh failed for {username}: {str(e) or 'timeout'}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    async def get_profile_image(self, username: str, budget: float = 10.0) -> Optional[str]:
+        """Get the profile image URL for a username within a total time budget
+
+        Fresh cache hits return immediately. Stale hits are served as-is while the
+        URL is refreshed in the background. Raises CircuitOpenError when Roblox is
+        failing and there is nothing cached to fall back on.
+        """
+        cached = self._cache.get(username.lower())
+        if cached:
+            image_url, fetched_at = cached
+            if time.monotonic() - fetched_at >= self.cache_ttl:
+                self._schedule_refresh(username, budget)
+            return image_url
+
+        key = username.lower()
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.create_task(self._fetch_through_breaker(username, budget))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one caller giving up doesn't cancel the lookup for the others
+        return await asyncio.shield(task)
+
+    async def get_profile_images(
+        self, usernames: List[str], budget: float = 10.0
+    ) -> Tuple[Dict[str, Optional[str]], Optional[Exception]]:
+        """Get profile image URLs for many users in one batch within a total time budget
+
+        Cached users are served from the cache, the rest are fetched together.
+        Returns the image URLs found (None for users that don't exist) and the
+        error that stopped the batch fetch, if any; users it covered are left out.
+        """
+        images: Dict[str, Optional[str]] = {}
+        missing = []
+        for username in usernames:
+            cached = self._cache.get(username.lower())
+            if cached:
+                images[username] = cached[0]
+                if time.monotonic() - cached[1] >= self.cache_ttl:
+                    self._schedule_refresh(username, budget)
+            else:
+                missing.append(username)
+
+        if not missing:
+            return images, None
+
+        try:
+            fetched = await self._through_breaker(
+                lambda deadline: self.fetch_profile_images(missing, deadline), budget
+            )
+        except (RobloxAPIError, asyncio.TimeoutError) as e:
+            return images, e
+
+        for username, image_url in fetched.items():
+            if image_url:
+                self._store(username.lower(), image_url)
+            images[username] = image_url
+        return images, None
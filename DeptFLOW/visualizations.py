@@ -1,3 +1,4 @@
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
@@ -9,8 +10,10 @@ def create_completion_heatmap(habit_logs, habit_name):
         return None
         
     # Prepare data for heatmap
-    habit_logs['week'] = pd.to_datetime(habit_logs['date']).dt.isocalendar().week
-    habit_logs['weekday'] = pd.to_datetime(habit_logs['date']).dt.weekday
+    # Key rows on the week's Monday so ranges longer than a year don't fold together
+    dates = pd.to_datetime(habit_logs['date'])
+    habit_logs['weekday'] = dates.dt.weekday
+    habit_logs['week'] = (dates - pd.to_timedelta(habit_logs['weekday'], unit='D')).dt.date
     
     # Create heatmap
     fig = go.Figure(data=go.Heatmap(
@@ -28,24 +31,73 @@ def create_completion_heatmap(habit_logs, habit_name):
             tickvals=[0, 1, 2, 3, 4, 5, 6]
         ),
         yaxis=dict(
-            title='Week of Year'
+            title='Week Starting'
         )
     )
     return fig
 
+# Most points a single trace may send to the browser before it is resampled
+MAX_CHART_POINTS = 730
+# Traces with more points than this are drawn with WebGL instead of SVG
+WEBGL_POINT_THRESHOLD = 365
+
+# Resampling rule -> (label, rolling average window)
+RESAMPLE_RULES = {
+    'D': ('Daily', 7),
+    'W': ('Weekly', 4),
+    'MS': ('Monthly', 3),
+}
+
+def choose_resample_rule(start_date, end_date, max_points=MAX_CHART_POINTS):
+    """Pick the finest of daily, weekly or monthly buckets that fits in the point budget"""
+    days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1
+    if days <= max_points:
+        return 'D'
+    if days / 7 <= max_points:
+        return 'W'
+    return 'MS'
+
+def resample_completion_rate(habit_logs, max_points=MAX_CHART_POINTS):
+    """Completion rate per bucket plus a rolling average, sized to the point budget"""
+    daily = habit_logs.dropna(subset=['date']).copy()
+    daily['date'] = pd.to_datetime(daily['date'])
+    daily = daily.groupby('date')['completed'].mean()
+
+    rule = choose_resample_rule(daily.index.min(), daily.index.max(), max_points)
+    rate = daily.resample(rule).mean().dropna() if rule != 'D' else daily
+    window = RESAMPLE_RULES[rule][1]
+
+    resampled = rate.rename('completed').reset_index()
+    resampled['rolling'] = resampled['completed'].rolling(window, min_periods=1).mean()
+    return resampled, rule
+
 def create_completion_rate_chart(habit_logs):
-    if habit_logs.empty:
+    if habit_logs.empty or habit_logs['date'].isna().all():
         return None
-        
-    # Calculate completion rate by date
-    completion_rate = habit_logs.groupby('date')['completed'].mean().reset_index()
-    
-    fig = px.line(
-        completion_rate,
-        x='date',
-        y='completed',
-        title='Daily Completion Rate',
-        labels={'completed': 'Completion Rate', 'date': 'Date'}
+
+    # Resample server-side so the payload stays bounded however long the range is
+    completion_rate, rule = resample_completion_rate(habit_logs)
+    label, window = RESAMPLE_RULES[rule]
+    scatter = go.Scattergl if len(completion_rate) > WEBGL_POINT_THRESHOLD else go.Scatter
+
+    fig = go.Figure()
+    fig.add_trace(scatter(
+        x=completion_rate['date'],
+        y=completion_rate['completed'],
+        mode='lines',
+        name='Completion Rate'
+    ))
+    fig.add_trace(scatter(
+        x=completion_rate['date'],
+        y=completion_rate['rolling'],
+        mode='lines',
+        name=f'{window}-point Rolling Average',
+        line=dict(dash='dash')
+    ))
+    fig.update_layout(
+        title=f'{label} Completion Rate',
+        xaxis_title='Date',
+        yaxis_title='Completion Rate'
     )
     return fig
 
@@ -78,3 +130,86 @@ def create_weekly_pattern(habit_logs):
         labels={'x': 'Day of Week', 'y': 'Completion Rate'}
     )
     return fig
+
+def compute_overview_summary(habits, completed, logged):
+    """Per-habit totals, completion rate and streaks from habits x days matrices
+
+    Streaks count completed days and are only broken by a logged miss, the same
+    rule get_streak_data uses, and are limited to the selected range.
+    """
+    days_logged = logged.sum(axis=1)
+    days_completed = completed.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.where(days_logged > 0, days_completed / days_logged * 100, 0.0)
+
+    # Number the runs between misses, then count completions per run
+    misses = logged & ~completed
+    run_ids = np.cumsum(misses, axis=1)
+    n_habits, n_days = completed.shape
+    flat_runs = (np.arange(n_habits)[:, None] * (n_days + 1) + run_ids).ravel()
+    run_lengths = np.bincount(
+        flat_runs, weights=completed.ravel(), minlength=n_habits * (n_days + 1)
+    ).reshape(n_habits, n_days + 1)
+    longest = run_lengths.max(axis=1) if n_days else np.zeros(n_habits)
+    current = run_lengths[np.arange(n_habits), run_ids[:, -1]] if n_days else np.zeros(n_habits)
+
+    return pd.DataFrame({
+        'Habit': habits['name'].to_numpy(),
+        'Days Logged': days_logged,
+        'Days Completed': days_completed,
+        'Completion Rate': rate.round(2),
+        'Current Streak': current.astype(int),
+        'Longest Streak': longest.astype(int),
+    })
+
+def compute_habit_correlation(habits, completed, logged):
+    """Pearson correlation between every pair of habits over days both were logged"""
+    x = completed.astype(float)
+    m = logged.astype(float)
+
+    # Pairwise sums restricted to days logged for both habits
+    n = m @ m.T
+    sum_x = x @ m.T          # [i, j]: sum of habit i over days j was also logged
+    sum_y = sum_x.T
+    sum_xy = x @ x.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_x = sum_x / n
+        mean_y = sum_y / n
+        # Completions are 0/1, so x² == x
+        cov = sum_xy / n - mean_x * mean_y
+        var_x = mean_x - mean_x ** 2
+        var_y = mean_y - mean_y ** 2
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[(n < 2) | ~np.isfinite(corr)] = np.nan
+
+    names = habits['name'].to_numpy()
+    return pd.DataFrame(corr.clip(-1, 1), index=names, columns=names)
+
+def create_overview_rate_chart(summary):
+    if summary.empty:
+        return None
+
+    fig = px.bar(
+        summary.sort_values('Completion Rate'),
+        x='Completion Rate',
+        y='Habit',
+        orientation='h',
+        title='Completion Rate by Habit',
+        labels={'Completion Rate': 'Completion Rate (%)'}
+    )
+    return fig
+
+def create_correlation_heatmap(correlation):
+    if correlation.empty:
+        return None
+
+    fig = go.Figure(data=go.Heatmap(
+        z=correlation.to_numpy(),
+        x=correlation.columns,
+        y=correlation.index,
+        zmin=-1,
+        zmax=1,
+        colorscale='RdBu'
+    ))
+    fig.update_layout(title='Habit Correlation')
+    return fig